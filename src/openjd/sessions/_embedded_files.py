@@ -7,7 +7,6 @@ from dataclasses import dataclass
 from enum import Enum
 from logging import LoggerAdapter
 from pathlib import Path
-from shutil import chown
 from tempfile import mkstemp
 from typing import Any, Generator, Optional, cast
 
@@ -20,7 +19,10 @@ from ._session_user import PosixSessionUser, SessionUser, WindowsSessionUser
 from ._types import EmbeddedFilesListType, EmbeddedFileType
 
 from ._windows_permission_helper import WindowsPermissionHelper
-from ._os_checker import is_windows
+from ._os_checker import is_posix, is_windows
+
+if is_posix():
+    import grp
 
 if is_windows():
     from ._win32._helpers import get_process_user  # type: ignore
@@ -57,23 +59,30 @@ def write_file_for_user(
     #  S_IWUSR - Write by owner
     mode = stat.S_IRUSR | stat.S_IWUSR | (additional_permissions & stat.S_IRWXU)
     with _open_context(filename, flags, mode=mode) as fd:
-        os.write(fd, data.encode("utf-8"))
-
-    if os.name == "posix":
-        if user is not None:
-            user = cast(PosixSessionUser, user)
-            # Set the group of the file
-            chown(filename, group=user.group)
-            # Update the permissions to include the group after the group is changed
-            # Note: Only after changing group for security in case the group-ownership
-            # change fails.
-            mode |= stat.S_IRGRP | stat.S_IWGRP | (additional_permissions & stat.S_IRWXG)
-
-        # The file may have already existed before calling this function (e.g. created by mkstemp)
-        # so unconditionally set the file permissions to ensure that additional_permissions are set.
-        os.chmod(filename, mode=mode)
-
-    elif os.name == "nt":
+        # os.write() may write only part of the buffer (e.g. if interrupted by a signal), so
+        # write the remainder until it's all out. The memoryview makes each slice copy-free.
+        remaining = memoryview(data.encode("utf-8"))
+        while remaining:
+            remaining = remaining[os.write(fd, remaining) :]
+
+        if os.name == "posix":
+            # Change the group and permissions through the open descriptor rather than the
+            # path; saves resolving the path again for each of these calls.
+            if user is not None:
+                user = cast(PosixSessionUser, user)
+                # Set the group of the file
+                os.fchown(fd, -1, grp.getgrnam(user.group).gr_gid)  # type: ignore
+                # Update the permissions to include the group after the group is changed
+                # Note: Only after changing group for security in case the group-ownership
+                # change fails.
+                mode |= stat.S_IRGRP | stat.S_IWGRP | (additional_permissions & stat.S_IRWXG)
+
+            # The file may have already existed before calling this function (e.g. created by
+            # mkstemp) so unconditionally set the file permissions to ensure that
+            # additional_permissions are set.
+            os.fchmod(fd, mode)  # type: ignore
+
+    if os.name == "nt":
         if user is not None:
             user = cast(WindowsSessionUser, user)
             process_user = get_process_user()
@@ -139,18 +148,16 @@ class EmbeddedFiles:
 
         try:
             records = list[_FileRecord]()
-            # Generate the symbol table values and filenames
+            # Generate the filenames and add them to the symbol table
             for file in files:
                 # Raises: OSError
                 symbol, filename = self._get_symtab_entry(file)
                 records.append(_FileRecord(symbol=symbol, filename=filename, file=file))
+                symtab[symbol] = str(filename)
+                self._logger.info(f"Mapping: {symbol} -> {filename}")
 
-            # Add symbols to the symbol table
-            for record in records:
-                symtab[record.symbol] = str(record.filename)
-                self._logger.info(f"Mapping: {record.symbol} -> {record.filename}")
-
-            # Write the files to disk.
+            # Write the files to disk. This must be a separate pass; a file's data may
+            # reference the symbol of any of the files, including those later in the list.
             for record in records:
                 # Raises: OSError
                 self._materialize_file(record.filename, record.file, symtab)
@@ -5,13 +5,17 @@ import os
 POSIX = "posix"
 WINDOWS = "nt"
 
+# The operating system cannot change while we're running, so only check it once.
+_IS_POSIX = os.name == POSIX
+_IS_WINDOWS = os.name == WINDOWS
+
 
 def is_posix() -> bool:
-    return os.name == POSIX
+    return _IS_POSIX
 
 
 def is_windows() -> bool:
-    return os.name == WINDOWS
+    return _IS_WINDOWS
 
 
 def check_os() -> None:
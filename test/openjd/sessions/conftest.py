@@ -3,7 +3,7 @@
 import os
 import random
 import string
-from logging import INFO, LoggerAdapter, getLogger
+from logging import CRITICAL, INFO, LogRecord, LoggerAdapter, getLogger
 from logging.handlers import QueueHandler
 from queue import Empty, SimpleQueue
 from typing import Generator
@@ -12,6 +12,10 @@ import pytest
 from openjd.sessions import PosixSessionUser, WindowsSessionUser, BadCredentialsException
 from openjd.sessions._os_checker import is_posix, is_windows
 
+if is_posix():
+    import grp
+    import pwd
+
 if is_windows():
     from openjd.sessions._win32._helpers import (  # type: ignore
         get_current_process_session_id,
@@ -35,6 +39,18 @@ POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE = f"Must define environment vars {POSIX_T
 POSIX_SET_DISJOINT_USER_ENV_VARS_MESSAGE = f"Must define environment vars {POSIX_DISJOINT_USER_ENV_VAR} and {POSIX_DISJOINT_GROUP_ENV_VAR} to run target-user impersonation tests on posix."
 
 
+class _RecordQueueHandler(QueueHandler):
+    """A QueueHandler that enqueues the LogRecord as-is.
+
+    The default prepare() formats the record and copies it so that it can be pickled
+    across a process boundary. Our queues never leave the process, and the tests only
+    ever read the text of the records via getMessage().
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
+
+
 def build_logger(handler: QueueHandler) -> LoggerAdapter:
     charset = string.ascii_letters + string.digits + string.punctuation
     name_suffix = "".join(random.choices(charset, k=32))
@@ -44,12 +60,20 @@ def build_logger(handler: QueueHandler) -> LoggerAdapter:
     return LoggerAdapter(log, extra=dict())
 
 
+# For tests that don't check what is logged; drops everything before a record is even created.
+_null_logger = getLogger(f"{__name__}.null")
+_null_logger.setLevel(CRITICAL + 1)
+_null_logger.propagate = False
+NULL_LOGGER = LoggerAdapter(_null_logger, extra={})
+
+
 def collect_queue_messages(queue: SimpleQueue) -> list[str]:
     """Extract the text of messages from a SimpleQueue containing LogRecords"""
     messages: list[str] = []
+    get = queue.get_nowait
     try:
         while True:
-            messages.append(queue.get_nowait().getMessage())
+            messages.append(get().getMessage())
     except Empty:
         pass
     return messages
@@ -94,6 +118,29 @@ def posix_target_user() -> PosixSessionUser:
     )
 
 
+@pytest.fixture(scope="session")
+def posix_target_uid() -> int:
+    """The uid of the posix target user. Looked up once per test run, as with posix_target_gid."""
+    if not is_posix():
+        pytest.skip("Posix-specific feature")
+    user = os.environ.get(POSIX_TARGET_USER_ENV_VAR)
+    if user is None:
+        pytest.xfail(POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE)
+    return pwd.getpwnam(user).pw_uid  # type: ignore
+
+
+@pytest.fixture(scope="session")
+def posix_target_gid() -> int:
+    """The gid of the posix target user's group. It cannot change during a test run, so
+    it is looked up once rather than in every test that needs it."""
+    if not is_posix():
+        pytest.skip("Posix-specific feature")
+    group = os.environ.get(POSIX_SHARED_GROUP_ENV_VAR)
+    if group is None:
+        pytest.xfail(POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE)
+    return grp.getgrnam(group).gr_gid  # type: ignore
+
+
 @pytest.fixture(scope="function")
 def posix_disjoint_user() -> PosixSessionUser:
     if not is_posix():
@@ -160,7 +207,17 @@ def message_queue() -> SimpleQueue:
 
 @pytest.fixture(scope="function")
 def queue_handler(message_queue: SimpleQueue) -> QueueHandler:
-    return QueueHandler(message_queue)
+    return _RecordQueueHandler(message_queue)
+
+
+@pytest.fixture(scope="function")
+def queue_logger(queue_handler: QueueHandler) -> Generator[LoggerAdapter, None, None]:
+    """A logger that sends its records to the test's message_queue."""
+    logger = build_logger(queue_handler)
+    yield logger
+    # The logging module keeps every named logger alive, so detach the handler to let the
+    # test's queue, and any records left in it, be freed.
+    logger.logger.removeHandler(queue_handler)
 
 
 @pytest.fixture(scope="function")
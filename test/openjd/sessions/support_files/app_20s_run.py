@@ -2,7 +2,8 @@
 
 # A simple app for use in testing of the LoggingSubprocess.
 # Prints out an increasing series of integers (0, 1, 2, ...)
-# every second for 10 seconds
+# every second for 20 seconds, or for the number of seconds given as its
+# only argument.
 #
 # Hook SIGTERM (posix) or CTRL_BREAK_EVENT (windows) and print "Trapped"
 # and exit if we get the signal
@@ -24,7 +25,8 @@ if sys.platform.startswith("win"):
 else:
     signal.signal(signal.SIGTERM, hook)
 
-for i in range(0, 20):
+runtime = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+for i in range(0, runtime):
     print(f"Log from test {str(i)}")
     sys.stdout.flush()
     time.sleep(1)
@@ -18,7 +18,8 @@ if sys.platform.startswith("win"):
 else:
     signal.signal(signal.SIGTERM, hook)
 
-for i in range(0, 20):
+runtime = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+for i in range(0, runtime):
     print(i)
     sys.stdout.flush()
     time.sleep(1)
@@ -5,468 +5,379 @@
 from __future__ import annotations
 
 import logging
-from hashlib import sha256
-from logging import LoggerAdapter
-from logging.handlers import QueueHandler
-from queue import SimpleQueue
-from typing import Union
+from typing import Callable, Union
 from unittest.mock import MagicMock
 
 import pytest
+from hypothesis import HealthCheck, example, given, settings
+from hypothesis import strategies as st
 
 from openjd.sessions._action_filter import (
     ActionMessageKind,
     ActionMonitoringFilter,
 )
 
+_LoggerBuilder = Callable[[ActionMonitoringFilter], logging.Logger]
+
+# Passed as the `extra` of each log call so that records carry the session id the filters
+# look for, without wrapping every logger in a LoggerAdapter.
+_SESSION_EXTRA = {"session_id": "foo"}
+
+_ROOT_LOGGER = logging.getLogger()
+
+# Parametrize cases are plain tuples with a parallel tuple of ids, so that collection
+# does not need to build a ParameterSet wrapper for each case.
+_CAPTURES_SUPPRESS_CASES = (
+    ("openjd_progress: 50.0", ActionMessageKind.PROGRESS, float(50)),
+    ("openjd_status: a status string", ActionMessageKind.STATUS, "a status string"),
+    ("openjd_fail: an error message", ActionMessageKind.FAIL, "an error message"),
+    ("openjd_env: foo=bar", ActionMessageKind.ENV, {"name": "foo", "value": "bar"}),
+    ("openjd_env: F_F_12=bar", ActionMessageKind.ENV, {"name": "F_F_12", "value": "bar"}),
+    ("openjd_env: foo=", ActionMessageKind.ENV, {"name": "foo", "value": ""}),
+    ("openjd_env: foo= ", ActionMessageKind.ENV, {"name": "foo", "value": " "}),
+    ("openjd_env:  \t foo=bar", ActionMessageKind.ENV, {"name": "foo", "value": "bar"}),
+    ("openjd_unset_env: foo", ActionMessageKind.UNSET_ENV, "foo"),
+    ("openjd_unset_env: F_F_12", ActionMessageKind.UNSET_ENV, "F_F_12"),
+    ("openjd_unset_env:  \t foo", ActionMessageKind.UNSET_ENV, "foo"),
+    (
+        "openjd_session_runtime_loglevel: DEBUG",
+        ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
+        logging.DEBUG,
+    ),
+    (
+        "openjd_session_runtime_loglevel: INFO",
+        ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
+        logging.INFO,
+    ),
+    (
+        "openjd_session_runtime_loglevel: WARNING",
+        ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
+        logging.WARNING,
+    ),
+    (
+        "openjd_session_runtime_loglevel: ERROR",
+        ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
+        logging.ERROR,
+    ),
+)
+_CAPTURES_SUPPRESS_IDS = (
+    "progress",
+    "status",
+    "fail",
+    "env",
+    "env, allowable characters",
+    "env, assign empty",
+    "env, assign whitespace",
+    "env, leading whitespace",
+    "unset_env",
+    "unset_env, allowable characters",
+    "unset_env, leading whitespace",
+    "loglevel debug",
+    "loglevel info",
+    "loglevel warning",
+    "loglevel error",
+)
+
+_CAPTURES_NO_SUPPRESS_CASES = (
+    ("openjd_progress: 50.0", ActionMessageKind.PROGRESS, float(50)),
+    ("openjd_status: a status string", ActionMessageKind.STATUS, "a status string"),
+    ("openjd_fail: an error message", ActionMessageKind.FAIL, "an error message"),
+    ("openjd_env: foo=bar", ActionMessageKind.ENV, {"name": "foo", "value": "bar"}),
+    ("openjd_unset_env: foo", ActionMessageKind.UNSET_ENV, "foo"),
+)
+_CAPTURES_NO_SUPPRESS_IDS = ("progress", "status", "fail", "env", "unset_env")
+
+_MALFORMED_SET_ENV_MESSAGES = (
+    "openjd_env: foo",
+    "openjd_env: foo =value",
+    "openjd_env: 1F_F_12=bar",
+    "openjd_env: F😁=bar",
+)
+_MALFORMED_SET_ENV_IDS = (
+    "env, missing assignment",
+    "env, extra whitespace",
+    "env, start with digit",
+    "env, non-latin",
+)
+
+# Whether the filter reports a malformed message of the given kind as a failure. Malformed env
+# commands fail the action, since silently ignoring them would leave the environment wrong;
+# any other malformed message is simply not recognized.
+_MALFORMED_PREFIX_FAILS = {
+    "openjd_progress": False,
+    "openjd_status": False,
+    "openjd_fail": False,
+    "openjd_env": True,
+    "openjd_unset_env": True,
+}
+
+
+@st.composite
+def _malformed_prefix_messages(draw: st.DrawFn) -> str:
+    """Messages for one of the kinds in _MALFORMED_PREFIX_FAILS whose "openjd_<kind>: " prefix
+    is malformed by a missing space, by being uppercase, or by leading whitespace."""
+    prefix = draw(st.sampled_from(tuple(_MALFORMED_PREFIX_FAILS)))
+    body = draw(st.text(st.characters(blacklist_categories=("Cs",), blacklist_characters="\r\n")))
+    malformation = draw(st.sampled_from(("no space", "uppercase", "leading whitespace")))
+    if malformation == "no space":
+        return f"{prefix}:{body.lstrip(' ')}"
+    if malformation == "uppercase":
+        return f"{prefix.upper()}: {body}"
+    leading = draw(st.text(" \t", min_size=1))
+    return f"{leading}{prefix}: {body}"
+
+
+_MALFORMED_UNSET_ENV_MESSAGES = (
+    "openjd_unset_env: foo=bar",
+    "openjd_unset_env: 1F_F_12",
+    "openjd_unset_env: F😁",
+)
+_MALFORMED_UNSET_ENV_IDS = (
+    "unset_env, bad value",
+    "unset_env, start with digit",
+    "unset_env, non-latin",
+)
+
+_PROGRESS_ERROR_MESSAGES = (
+    "openjd_progress: fifty",
+    "openjd_progress: -0.01",
+    "openjd_progress: 100.1",
+)
+_PROGRESS_ERROR_IDS = ("not a float", "too small", "too big")
 
-class TestActionMonitoringFilter:
-    @pytest.fixture
-    def message_queue(self) -> SimpleQueue:
-        return SimpleQueue()
 
+@pytest.fixture(scope="module")
+def shared_callback() -> MagicMock:
+    return MagicMock()
+
+
+@pytest.fixture(scope="module")
+def action_filters(shared_callback: MagicMock) -> dict[bool, ActionMonitoringFilter]:
+    # The filter holds no per-test state other than its callback, so we build one
+    # for each value of suppress_filtered and share them across the tests.
+    return {
+        suppress_filtered: ActionMonitoringFilter(
+            session_id="foo", callback=shared_callback, suppress_filtered=suppress_filtered
+        )
+        for suppress_filtered in (True, False)
+    }
+
+
+@pytest.fixture
+def callback_mock(shared_callback: MagicMock) -> MagicMock:
+    shared_callback.reset_mock()
+    return shared_callback
+
+
+class TestActionMonitoringFilter:
     @pytest.fixture
-    def queue_handler(self, message_queue: SimpleQueue) -> QueueHandler:
-        return QueueHandler(message_queue)
-
-    def build_logger(
-        self, name: str, handler: QueueHandler, filter: ActionMonitoringFilter
-    ) -> logging.Logger:
-        log = logging.getLogger(".".join((__name__, name)))
-        log.setLevel(logging.INFO)
-        log.addHandler(handler)
-        log.addFilter(filter)
-        return log
+    def build_logger(self) -> _LoggerBuilder:
+        # Records that make it through the filter propagate to caplog's handler on the root logger.
+        # The loggers are never registered with the logging manager, so each call returns a
+        # distinct logger whatever its name, and they need no teardown.
+        def _build_logger(filter: ActionMonitoringFilter) -> logging.Logger:
+            log = logging.Logger(f"{__name__}.filtered", logging.INFO)
+            log.parent = _ROOT_LOGGER
+            log.addFilter(filter)
+            return log
+
+        return _build_logger
 
     @pytest.mark.parametrize(
-        "message,kind,value",
-        (
-            pytest.param(
-                "openjd_progress: 50.0",
-                ActionMessageKind.PROGRESS,
-                float(50),
-                id="progress",
-            ),
-            pytest.param(
-                "openjd_status: a status string",
-                ActionMessageKind.STATUS,
-                "a status string",
-                id="status",
-            ),
-            pytest.param(
-                "openjd_fail: an error message",
-                ActionMessageKind.FAIL,
-                "an error message",
-                id="fail",
-            ),
-            pytest.param(
-                "openjd_env: foo=bar",
-                ActionMessageKind.ENV,
-                {"name": "foo", "value": "bar"},
-                id="env",
-            ),
-            pytest.param(
-                "openjd_env: F_F_12=bar",
-                ActionMessageKind.ENV,
-                {"name": "F_F_12", "value": "bar"},
-                id="env, allowable characters",
-            ),
-            pytest.param(
-                "openjd_env: foo=",
-                ActionMessageKind.ENV,
-                {"name": "foo", "value": ""},
-                id="env, assign empty",
-            ),
-            pytest.param(
-                "openjd_env: foo= ",
-                ActionMessageKind.ENV,
-                {"name": "foo", "value": " "},
-                id="env, assign whitespace",
-            ),
-            pytest.param(
-                "openjd_env:  \t foo=bar",
-                ActionMessageKind.ENV,
-                {"name": "foo", "value": "bar"},
-                id="env, leading whitespace",
-            ),
-            pytest.param(
-                "openjd_unset_env: foo",
-                ActionMessageKind.UNSET_ENV,
-                "foo",
-                id="unset_env",
-            ),
-            pytest.param(
-                "openjd_unset_env: F_F_12",
-                ActionMessageKind.UNSET_ENV,
-                "F_F_12",
-                id="unset_env, allowable characters",
-            ),
-            pytest.param(
-                "openjd_unset_env:  \t foo",
-                ActionMessageKind.UNSET_ENV,
-                "foo",
-                id="unset_env, leading whitespace",
-            ),
-            pytest.param(
-                "openjd_session_runtime_loglevel: DEBUG",
-                ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
-                logging.DEBUG,
-                id="loglevel debug",
-            ),
-            pytest.param(
-                "openjd_session_runtime_loglevel: INFO",
-                ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
-                logging.INFO,
-                id="loglevel debug",
-            ),
-            pytest.param(
-                "openjd_session_runtime_loglevel: WARNING",
-                ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
-                logging.WARNING,
-                id="loglevel debug",
-            ),
-            pytest.param(
-                "openjd_session_runtime_loglevel: ERROR",
-                ActionMessageKind.SESSION_RUNTIME_LOGLEVEL,
-                logging.ERROR,
-                id="loglevel debug",
-            ),
-        ),
+        "message,kind,value", _CAPTURES_SUPPRESS_CASES, ids=_CAPTURES_SUPPRESS_IDS
     )
     def test_captures_suppress(
         self,
-        message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        caplog: pytest.LogCaptureFixture,
+        build_logger: _LoggerBuilder,
         message: str,
         kind: ActionMessageKind,
         value: Union[float, str],
     ) -> None:
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "suppress" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(
-            session_id="foo", callback=callback_mock, suppress_filtered=True
-        )
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[True]
+        log = build_logger(filter)
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
         callback_mock.assert_called_once_with(kind, value, False)
-        assert message_queue.qsize() == 0, "Message is suppressed"
+        assert len(caplog.records) == 0, "Message is suppressed"
 
     def test_ignores_different_session(
         self,
-        message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        caplog: pytest.LogCaptureFixture,
+        build_logger: _LoggerBuilder,
     ) -> None:
         # GIVEN
         message = "openjd_fail: an error message"
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "suppress" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(
-            session_id="foo", callback=callback_mock, suppress_filtered=True
-        )
-        log = self.build_logger(logger_name, queue_handler, filter)
+        filter = action_filters[True]
+        log = build_logger(filter)
 
         # WHEN
         log.info(message)
 
         # THEN
         callback_mock.assert_not_called()
-        assert message_queue.qsize() == 1
+        assert len(caplog.records) == 1
 
     @pytest.mark.parametrize(
-        "message,kind,value",
-        (
-            pytest.param(
-                "openjd_progress: 50.0",
-                ActionMessageKind.PROGRESS,
-                float(50),
-                id="progress",
-            ),
-            pytest.param(
-                "openjd_status: a status string",
-                ActionMessageKind.STATUS,
-                "a status string",
-                id="status",
-            ),
-            pytest.param(
-                "openjd_fail: an error message",
-                ActionMessageKind.FAIL,
-                "an error message",
-                id="fail",
-            ),
-            pytest.param(
-                "openjd_env: foo=bar",
-                ActionMessageKind.ENV,
-                {"name": "foo", "value": "bar"},
-                id="env",
-            ),
-            pytest.param(
-                "openjd_unset_env: foo",
-                ActionMessageKind.UNSET_ENV,
-                "foo",
-                id="unset_env",
-            ),
-        ),
+        "message,kind,value", _CAPTURES_NO_SUPPRESS_CASES, ids=_CAPTURES_NO_SUPPRESS_IDS
     )
     def test_captures_no_suppress(
         self,
-        message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        caplog: pytest.LogCaptureFixture,
+        build_logger: _LoggerBuilder,
         message: str,
         kind: ActionMessageKind,
         value: Union[float, str],
     ) -> None:
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "no_suppress" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[False]
+        log = build_logger(filter)
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
         callback_mock.assert_called_once_with(kind, value, False)
-        assert message_queue.qsize() == 1, "Message passed through"
-        assert message_queue.get(block=False).getMessage() == message
-
-    @pytest.mark.parametrize(
-        "message",
-        (
-            pytest.param("openjd_progress:50.0", id="progress, no space"),
-            pytest.param("OPENJD_PROGRESS: 50.0", id="progress, uppercase"),
-            pytest.param(" openjd_progress: 50.0", id="progress, leading whitespace"),
-            pytest.param(
-                "openjd_status:a status string",
-                id="status, no space",
-            ),
-            pytest.param(
-                "OPENJD_STATUS: a status string",
-                id="status, uppercase",
-            ),
-            pytest.param(
-                " openjd_status: a status string",
-                id="status, leading whitespace",
-            ),
-            pytest.param(
-                "openjd_fail:an error message",
-                id="fail, no space",
-            ),
-            pytest.param(
-                "OPENJD_FAIL: an error message",
-                id="fail, uppercase",
-            ),
-        ),
-    )
-    def test_malformed_does_not_match_no_callback(
-        self, queue_handler: QueueHandler, message: str
+        assert len(caplog.records) == 1, "Message passed through"
+        assert caplog.records[0].getMessage() == message
+
+    # Every example shares the function-scoped fixtures, so the callback is reset per example.
+    @settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+    @given(message=_malformed_prefix_messages())
+    @example(message="openjd_progress:50.0")
+    @example(message="OPENJD_PROGRESS: 50.0")
+    @example(message=" openjd_progress: 50.0")
+    @example(message="openjd_status:a status string")
+    @example(message="OPENJD_STATUS: a status string")
+    @example(message=" openjd_status: a status string")
+    @example(message="openjd_fail:an error message")
+    @example(message="OPENJD_FAIL: an error message")
+    @example(message="openjd_env:foo=bar")
+    @example(message="OPENJD_ENV: foo=bar")
+    @example(message=" openjd_env: foo=bar")
+    @example(message="openjd_unset_env:foo")
+    @example(message="OPENJD_UNSET_ENV: foo")
+    @example(message=" openjd_unset_env: foo")
+    def test_malformed_prefix(
+        self,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        build_logger: _LoggerBuilder,
+        message: str,
     ) -> None:
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "malformed" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        callback_mock.reset_mock()
+        filter = action_filters[False]
+        log = build_logger(filter)
+        kind = message.lstrip().lower().partition(":")[0]
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
-        callback_mock.assert_not_called()
-
-    @pytest.mark.parametrize(
-        "message",
-        (
-            pytest.param(
-                "openjd_env: foo",
-                id="env, missing assignment",
-            ),
-            pytest.param(
-                "openjd_env: foo =value",
-                id="env, extra whitespace",
-            ),
-            pytest.param(
-                "openjd_env: 1F_F_12=bar",
-                id="env, start with digit",
-            ),
-            pytest.param(
-                "openjd_env: F😁=bar",
-                id="env, non-latin",
-            ),
-        ),
-    )
-    def test_malformed_set_env_assigment(self, queue_handler: QueueHandler, message: str) -> None:
+        if _MALFORMED_PREFIX_FAILS[kind]:
+            err_message = (
+                f"Open Job Description: Incorrectly formatted openjd env command ({message})"
+            )
+            callback_mock.assert_called_once_with(ActionMessageKind.FAIL, err_message, True)
+        else:
+            callback_mock.assert_not_called()
+
+    @pytest.mark.parametrize("message", _MALFORMED_SET_ENV_MESSAGES, ids=_MALFORMED_SET_ENV_IDS)
+    def test_malformed_set_env_assigment(
+        self,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        build_logger: _LoggerBuilder,
+        message: str,
+    ) -> None:
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "malformed" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[False]
+        log = build_logger(filter)
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
         err_message = "Failed to parse environment variable assignment."
         callback_mock.assert_called_once_with(ActionMessageKind.ENV, err_message, True)
 
-    @pytest.mark.parametrize(
-        "message",
-        (
-            pytest.param(
-                "openjd_env:foo=bar",
-                id="env, no space",
-            ),
-            pytest.param(
-                "OPENJD_ENV: foo=bar",
-                id="env, uppercase",
-            ),
-            pytest.param(
-                " openjd_env: foo=bar",
-                id="env, leading whitespace",
-            ),
-            pytest.param(
-                "openjd_unset_env:foo",
-                id="unset_env, no space",
-            ),
-            pytest.param(
-                "OPENJD_UNSET_ENV: foo",
-                id="unset_env, uppercase",
-            ),
-            pytest.param(
-                " openjd_unset_env: foo",
-                id="unset_env, leading whitespace",
-            ),
-        ),
-    )
-    def test_malformed_openjd_regex(self, queue_handler: QueueHandler, message: str) -> None:
-        # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "malformed" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
-
-        # WHEN
-        loga.info(message)
-
-        # THEN
-        err_message = f"Open Job Description: Incorrectly formatted openjd env command ({message})"
-        callback_mock.assert_called_once_with(ActionMessageKind.FAIL, err_message, True)
-
-    @pytest.mark.parametrize(
-        "message",
-        (
-            pytest.param(
-                "openjd_unset_env: foo=bar",
-                id="unset_env, bad value",
-            ),
-            pytest.param(
-                "openjd_unset_env: 1F_F_12",
-                id="unset_env, start with digit",
-            ),
-            pytest.param(
-                "openjd_unset_env: F😁",
-                id="unset_env, non-latin",
-            ),
-        ),
-    )
+    @pytest.mark.parametrize("message", _MALFORMED_UNSET_ENV_MESSAGES, ids=_MALFORMED_UNSET_ENV_IDS)
     def test_malformed_does_not_match_unset_env(
-        self, queue_handler: QueueHandler, message: str
+        self,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        build_logger: _LoggerBuilder,
+        message: str,
     ) -> None:
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "malformed" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[False]
+        log = build_logger(filter)
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
         err_message = "Failed to parse environment variable name."
         callback_mock.assert_called_once_with(ActionMessageKind.UNSET_ENV, err_message, True)
 
-    @pytest.mark.parametrize(
-        "message",
-        (
-            pytest.param("openjd_progress: fifty", id="not a float"),
-            pytest.param("openjd_progress: -0.01", id="too small"),
-            pytest.param("openjd_progress: 100.1", id="too big"),
-        ),
-    )
+    @pytest.mark.parametrize("message", _PROGRESS_ERROR_MESSAGES, ids=_PROGRESS_ERROR_IDS)
     def test_progress_appends_error(
-        self, message_queue: SimpleQueue, queue_handler: QueueHandler, message: str
+        self,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        caplog: pytest.LogCaptureFixture,
+        build_logger: _LoggerBuilder,
+        message: str,
     ) -> None:
         # When the floating point value in an openjd_progress message is either
         # not a float or out of the allowable range of values, we always pass the
         # message through to the log and we append an error message to it.
         #
         # GIVEN
-        h = sha256()
-        h.update(message.encode("utf-8"))
-        logger_name = "appends" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(session_id="foo", callback=callback_mock)
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[False]
+        log = build_logger(filter)
         expected_message = (
             message
             + " -- ERROR: Progress must be a floating point value between 0.0 and 100.0, inclusive."
         )
 
         # WHEN
-        loga.info(message)
+        log.info(message, extra=_SESSION_EXTRA)
 
         # THEN
         callback_mock.assert_not_called()
-        assert message_queue.qsize() == 1, "Message passed through"
-        assert message_queue.get(block=False).getMessage() == expected_message
+        assert len(caplog.records) == 1, "Message passed through"
+        assert caplog.records[0].getMessage() == expected_message
 
     def test_handles_non_string(
         self,
-        message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        callback_mock: MagicMock,
+        action_filters: dict[bool, ActionMonitoringFilter],
+        caplog: pytest.LogCaptureFixture,
+        build_logger: _LoggerBuilder,
     ) -> None:
         # GIVEN
-        h = sha256()
-        h.update("exception-test".encode("utf-8"))
-        logger_name = "non_string" + h.hexdigest()[0:32]
-        callback_mock = MagicMock()
-        filter = ActionMonitoringFilter(
-            session_id="foo", callback=callback_mock, suppress_filtered=True
-        )
-        log = self.build_logger(logger_name, queue_handler, filter)
-        loga = LoggerAdapter(log, extra={"session_id": "foo"})
+        filter = action_filters[True]
+        log = build_logger(filter)
 
         # WHEN
         try:
             raise Exception("Surprise!")
         except Exception as e:
-            loga.exception(e)
+            log.exception(e, extra=_SESSION_EXTRA)
 
         # THEN
         callback_mock.assert_not_called()
-        assert message_queue.qsize() == 1
-        assert "Exception: Surprise!" in message_queue.get(block=False).getMessage()
+        assert len(caplog.records) == 1
+        assert "Exception: Surprise!" in caplog.text
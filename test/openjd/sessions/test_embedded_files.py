@@ -1,11 +1,8 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
 import os
-import stat
-import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from unittest.mock import MagicMock
 from openjd.sessions._os_checker import is_posix, is_windows
 import pytest
 
@@ -27,11 +24,43 @@ from .conftest import (
     has_windows_user,
     WIN_SET_TEST_ENV_VARS_MESSAGE,
     POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
+    NULL_LOGGER,
 )
 
+# Input-only embedded files for the _get_symtab_entry tests. Constructed once, as building
+# the models runs their validation.
+_GIVEN_FILENAME = "test_filename.txt"
+_FILE_WITH_FILENAME = EmbeddedFileText_2023_09(
+    name="Foo",
+    type=EmbeddedFileTypes_2023_09.TEXT,
+    filename=_GIVEN_FILENAME,
+    data=DataString_2023_09("some data"),
+)
+_FILE_WITHOUT_FILENAME = EmbeddedFileText_2023_09(
+    name="Foo",
+    type=EmbeddedFileTypes_2023_09.TEXT,
+    data=DataString_2023_09("some data"),
+)
+
+
+@pytest.fixture(scope="class")
+def step_embedded_files(tmp_path_factory: pytest.TempPathFactory) -> EmbeddedFiles:
+    """A Step-scoped EmbeddedFiles without a user, shared by the tests of a class that only
+    call _materialize_file() with filenames of their own."""
+    return EmbeddedFiles(
+        logger=NULL_LOGGER,
+        scope=EmbeddedFilesScope.STEP,
+        session_files_directory=tmp_path_factory.mktemp("step"),
+    )
+
+
+@pytest.fixture(scope="class")
+def materialize_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A session files directory shared by the tests of a class. Files that those tests don't
+    name explicitly are given unique names by EmbeddedFiles, so the tests cannot collide."""
+    return tmp_path_factory.mktemp("materialize")
+
 
-# tmp_path - builtin temporary directory
-@pytest.mark.usefixtures("tmp_path")
 class TestEmbeddedFiles:
     class TestGetSymtabEntry:
         """Tests for EmbeddedFiles._get_symtab_entry().
@@ -60,15 +89,10 @@ class TestEmbeddedFiles:
 
             # GIVEN
             test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=scope, session_files_directory=tmp_path
-            )
-            filename = "test_filename.txt"
-            test_file = EmbeddedFileText_2023_09(
-                name="Foo",
-                type=EmbeddedFileTypes_2023_09.TEXT,
-                filename=filename,
-                data=DataString_2023_09("some data"),
+                logger=NULL_LOGGER, scope=scope, session_files_directory=tmp_path
             )
+            filename = _GIVEN_FILENAME
+            test_file = _FILE_WITH_FILENAME
 
             # WHEN
             result_symbol, result_filename = test_obj._get_symtab_entry(test_file)
@@ -101,13 +125,9 @@ class TestEmbeddedFiles:
 
             # GIVEN
             test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=scope, session_files_directory=tmp_path
-            )
-            test_file = EmbeddedFileText_2023_09(
-                name="Foo",
-                type=EmbeddedFileTypes_2023_09.TEXT,
-                data=DataString_2023_09("some data"),
+                logger=NULL_LOGGER, scope=scope, session_files_directory=tmp_path
             )
+            test_file = _FILE_WITHOUT_FILENAME
 
             # WHEN
             result_symbol, result_filename = test_obj._get_symtab_entry(test_file)
@@ -123,53 +143,46 @@ class TestEmbeddedFiles:
         Note: Also tests EmbeddedFiles._find_value_prefix() indirectly.
         """
 
-        def test_writes_file(self, tmp_path: Path) -> None:
+        def test_writes_file(self, tmp_path: Path, step_embedded_files: EmbeddedFiles) -> None:
             # Basic test -- make sure that we write the correct data to the file, and that
             #  the file permissions are set correctly.
 
             # GIVEN
-            test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.STEP, session_files_directory=tmp_path
-            )
+            test_obj = step_embedded_files
             testdata = "some text data"
             test_file = EmbeddedFileText_2023_09(
                 name="Foo",
                 type=EmbeddedFileTypes_2023_09.TEXT,
                 data=DataString_2023_09(testdata),
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
 
             # WHEN
             test_obj._materialize_file(filename, test_file, symtab)
 
             # THEN
-            assert os.path.exists(filename)
             statinfo = os.stat(filename)
             assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
             assert statinfo.st_gid == os.getegid(), "File group is this process' group"  # type: ignore
-            assert statinfo.st_mode & stat.S_IRWXU == (stat.S_IRUSR | stat.S_IWUSR), "Owner has r/w"
-            assert statinfo.st_mode & stat.S_IRWXG == 0, "Group has no permissions"
-            assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            # Permission bits as octal digits: owner, group, others (r=4, w=2, x=1).
+            assert (statinfo.st_mode & 0o777) == 0o600, "Owner has r/w; group & others have none"
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
-        def test_truncates_file(self, tmp_path: Path) -> None:
+        def test_truncates_file(self, tmp_path: Path, step_embedded_files: EmbeddedFiles) -> None:
             # Make sure that when we write the embedded file that we open it truncated.
             # Else we'll have extra data at the end.
 
             # GIVEN
-            test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.STEP, session_files_directory=tmp_path
-            )
+            test_obj = step_embedded_files
             testdata = "some text data"
             test_file = EmbeddedFileText_2023_09(
                 name="Foo",
                 type=EmbeddedFileTypes_2023_09.TEXT,
                 data=DataString_2023_09(testdata),
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
             with open(filename, "w") as file:
                 file.write("This needs to be longer than our test data to test truncation")
@@ -178,17 +191,16 @@ class TestEmbeddedFiles:
             test_obj._materialize_file(filename, test_file, symtab)
 
             # THEN
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
-        def test_writes_file_runnable(self, tmp_path: Path) -> None:
+        def test_writes_file_runnable(
+            self, tmp_path: Path, step_embedded_files: EmbeddedFiles
+        ) -> None:
             # As test_writes_file() but also setting the execute bit on the file.
 
             # GIVEN
-            test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.STEP, session_files_directory=tmp_path
-            )
+            test_obj = step_embedded_files
             testdata = "some text data"
             test_file = EmbeddedFileText_2023_09(
                 name="Foo",
@@ -196,32 +208,28 @@ class TestEmbeddedFiles:
                 data=DataString_2023_09(testdata),
                 runnable=True,
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
 
             # WHEN
             test_obj._materialize_file(filename, test_file, symtab)
 
             # THEN
-            assert os.path.exists(filename)
             statinfo = os.stat(filename)
             assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
             assert statinfo.st_gid == os.getegid(), "File group is this process' group"  # type: ignore
-            assert statinfo.st_mode & stat.S_IRWXU == stat.S_IRWXU, "Owner has r/w/x"
-            assert statinfo.st_mode & stat.S_IRWXG == 0, "Group has no permissions"
-            assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            assert (statinfo.st_mode & 0o777) == 0o700, "Owner has r/w/x; group & others have none"
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
-        def test_resolves_formatstring(self, tmp_path: Path) -> None:
+        def test_resolves_formatstring(
+            self, tmp_path: Path, step_embedded_files: EmbeddedFiles
+        ) -> None:
             # Addition to the writes_file test that now ensures that the FormatStrings in the file
             # are correctly resolved.
 
             # GIVEN
-            test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.STEP, session_files_directory=tmp_path
-            )
+            test_obj = step_embedded_files
             testdata = "{{ Var.Value }}"
             testdataresult = "some data"
             test_file = EmbeddedFileText_2023_09(
@@ -229,7 +237,7 @@ class TestEmbeddedFiles:
                 type=EmbeddedFileTypes_2023_09.TEXT,
                 data=DataString_2023_09(testdata),
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             testdataresult = "some data"
             symtab = SymbolTable(source={"Var.Value": testdataresult})
 
@@ -238,8 +246,7 @@ class TestEmbeddedFiles:
 
             # THEN
             assert os.path.exists(filename)
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            result_contents = Path(filename).read_text()
             assert result_contents == testdataresult, "File contents are as expected"
 
         @pytest.mark.xfail(
@@ -247,12 +254,14 @@ class TestEmbeddedFiles:
             reason=POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
         )
         @pytest.mark.usefixtures("posix_target_user")
-        def test_changes_owner(self, tmp_path: Path, posix_target_user: PosixSessionUser) -> None:
+        def test_changes_owner(
+            self, tmp_path: Path, posix_target_user: PosixSessionUser, posix_target_gid: int
+        ) -> None:
             # Test that the group of the file is properly changed when a user is given.
 
             # GIVEN
             test_obj = EmbeddedFiles(
-                logger=MagicMock(),
+                logger=NULL_LOGGER,
                 scope=EmbeddedFilesScope.STEP,
                 session_files_directory=tmp_path,
                 user=posix_target_user,
@@ -263,25 +272,18 @@ class TestEmbeddedFiles:
                 type=EmbeddedFileTypes_2023_09.TEXT,
                 data=DataString_2023_09(testdata),
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
-            import grp
-
-            gid = grp.getgrnam(posix_target_user.group).gr_gid  # type: ignore
 
             # WHEN
             test_obj._materialize_file(filename, test_file, symtab)
 
             # THEN
-            assert os.path.exists(filename)
             statinfo = os.stat(filename)
             assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
-            assert statinfo.st_gid == gid, "File group is the user's group"
-            assert statinfo.st_mode & stat.S_IRWXU == (stat.S_IRUSR | stat.S_IWUSR), "Owner has r/w"
-            assert statinfo.st_mode & stat.S_IRWXG == (stat.S_IRGRP | stat.S_IWGRP), "Group has r/w"
-            assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            assert statinfo.st_gid == posix_target_gid, "File group is the user's group"
+            assert (statinfo.st_mode & 0o777) == 0o660, "Owner & group have r/w; others have none"
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
         @pytest.mark.xfail(
@@ -290,13 +292,13 @@ class TestEmbeddedFiles:
         )
         @pytest.mark.usefixtures("posix_target_user")
         def test_changes_owner_runnable(
-            self, tmp_path: Path, posix_target_user: PosixSessionUser
+            self, tmp_path: Path, posix_target_user: PosixSessionUser, posix_target_gid: int
         ) -> None:
             # As test_changes_owner(), but also checks that the group execute bit is set if the file is runnable.
 
             # GIVEN
             test_obj = EmbeddedFiles(
-                logger=MagicMock(),
+                logger=NULL_LOGGER,
                 scope=EmbeddedFilesScope.STEP,
                 session_files_directory=tmp_path,
                 user=posix_target_user,
@@ -308,25 +310,18 @@ class TestEmbeddedFiles:
                 data=DataString_2023_09(testdata),
                 runnable=True,
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
-            import grp
-
-            gid = grp.getgrnam(posix_target_user.group).gr_gid  # type: ignore
 
             # WHEN
             test_obj._materialize_file(filename, test_file, symtab)
 
             # THEN
-            assert os.path.exists(filename)
             statinfo = os.stat(filename)
             assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
-            assert statinfo.st_gid == gid, "File group is the user's group"
-            assert statinfo.st_mode & stat.S_IRWXU == stat.S_IRWXU, "Owner has r/w/x"
-            assert statinfo.st_mode & stat.S_IRWXG == stat.S_IRWXG, "Group has r/w/x"
-            assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            assert statinfo.st_gid == posix_target_gid, "File group is the user's group"
+            assert (statinfo.st_mode & 0o777) == 0o770, "Owner & group have r/w/x; others have none"
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
     @pytest.mark.skipif(not is_windows(), reason="Windows-specific tests")
@@ -339,7 +334,7 @@ class TestEmbeddedFiles:
         def test_changes_owner(self, tmp_path: Path, windows_user: WindowsSessionUser) -> None:
             # GIVEN
             test_obj = EmbeddedFiles(
-                logger=MagicMock(),
+                logger=NULL_LOGGER,
                 scope=EmbeddedFilesScope.STEP,
                 session_files_directory=tmp_path,
                 user=windows_user,
@@ -350,7 +345,7 @@ class TestEmbeddedFiles:
                 type=EmbeddedFileTypes_2023_09.TEXT,
                 data=DataString_2023_09(testdata),
             )
-            filename = tmp_path / uuid.uuid4().hex
+            filename = tmp_path / os.urandom(8).hex()
             symtab = SymbolTable()
 
             # WHEN
@@ -361,14 +356,13 @@ class TestEmbeddedFiles:
             assert principal_has_access_to_object(
                 str(filename), windows_user.user, MODIFY_READ_WRITE_MASK
             ), "Windows user has access"
-            with open(filename, "r") as file:
-                result_contents = file.read()
+            result_contents = Path(filename).read_text()
             assert result_contents == testdata, "File contents are as expected"
 
     class TestMaterialize:
         """Tests for EmbeddedFiles.materialize()"""
 
-        def test_basic(self, tmp_path: Path) -> None:
+        def test_basic(self, materialize_dir: Path) -> None:
             # Basic test - we can write several files and they show up in the filesystem
             # where reported.
 
@@ -409,7 +403,9 @@ class TestEmbeddedFiles:
                 for f in test_data
             ]
             test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.ENV, session_files_directory=tmp_path
+                logger=NULL_LOGGER,
+                scope=EmbeddedFilesScope.ENV,
+                session_files_directory=materialize_dir,
             )
 
             # WHEN
@@ -419,23 +415,19 @@ class TestEmbeddedFiles:
             for data in test_data:
                 assert data.symbol in symtab, f"Symbol for {data.name} is in the symtab"
                 filename = symtab[data.symbol]
-                assert os.path.exists(filename), f"File exists for {data.name}"
-                with open(filename, "r") as file:
-                    result_contents = file.read()
+                if is_posix():
+                    # The stat doubles as the existence check.
+                    statinfo = os.stat(filename)
+                else:
+                    assert os.path.exists(filename), f"File exists for {data.name}"
+                result_contents = Path(filename).read_text()
                 assert result_contents == data.data, "File contents are as expected"
                 # Check file permissions
                 if is_posix():
-                    statinfo = os.stat(filename)
                     assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
                     assert statinfo.st_gid == os.getegid(), "File group is this process' group"  # type: ignore
-                    if data.runnable:
-                        assert statinfo.st_mode & stat.S_IRWXU == stat.S_IRWXU, "Owner has r/w/x"
-                    else:
-                        assert statinfo.st_mode & stat.S_IRWXU == (
-                            stat.S_IRUSR | stat.S_IWUSR
-                        ), "Owner has r/w"
-                    assert statinfo.st_mode & stat.S_IRWXG == 0, "Group has no permissions"
-                    assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
+                    expected_mode = 0o700 if data.runnable else 0o600
+                    assert (statinfo.st_mode & 0o777) == expected_mode, "Only the owner has access"
 
         @pytest.mark.skipif(not is_posix(), reason="posix-specific test")
         @pytest.mark.xfail(
@@ -444,7 +436,7 @@ class TestEmbeddedFiles:
         )
         @pytest.mark.usefixtures("posix_target_user")
         def test_basic_as_user_posix(
-            self, tmp_path: Path, posix_target_user: PosixSessionUser
+            self, materialize_dir: Path, posix_target_user: PosixSessionUser, posix_target_gid: int
         ) -> None:
             # Basic test - we can write several files and they show up in the filesystem
             # where reported.
@@ -486,14 +478,11 @@ class TestEmbeddedFiles:
                 for f in test_data
             ]
             test_obj = EmbeddedFiles(
-                logger=MagicMock(),
+                logger=NULL_LOGGER,
                 scope=EmbeddedFilesScope.ENV,
-                session_files_directory=tmp_path,
+                session_files_directory=materialize_dir,
                 user=posix_target_user,
             )
-            import grp
-
-            gid = grp.getgrnam(posix_target_user.group).gr_gid  # type: ignore
 
             # WHEN
             test_obj.materialize(given_files, symtab)
@@ -502,25 +491,14 @@ class TestEmbeddedFiles:
             for data in test_data:
                 assert data.symbol in symtab, f"Symbol for {data.name} is in the symtab"
                 filename = symtab[data.symbol]
-                assert os.path.exists(filename), f"File exists for {data.name}"
-                with open(filename, "r") as file:
-                    result_contents = file.read()
+                statinfo = os.stat(filename)
+                result_contents = Path(filename).read_text()
                 assert result_contents == data.data, "File contents are as expected"
                 # Check file permissions
-                statinfo = os.stat(filename)
                 assert statinfo.st_uid == os.geteuid(), "File owner is this process's owner"  # type: ignore
-                assert statinfo.st_gid == gid, "File group is the user's group"
-                if data.runnable:
-                    assert statinfo.st_mode & stat.S_IRWXU == stat.S_IRWXU, "Owner has r/w/x"
-                    assert statinfo.st_mode & stat.S_IRWXG == stat.S_IRWXG, "Group has r/w/x"
-                else:
-                    assert statinfo.st_mode & stat.S_IRWXU == (
-                        stat.S_IRUSR | stat.S_IWUSR
-                    ), "Owner has r/w"
-                    assert statinfo.st_mode & stat.S_IRWXG == (
-                        stat.S_IRGRP | stat.S_IWGRP
-                    ), "Group has r/w"
-                assert statinfo.st_mode & stat.S_IRWXO == 0, "Others have no permissions"
+                assert statinfo.st_gid == posix_target_gid, "File group is the user's group"
+                expected_mode = 0o770 if data.runnable else 0o660
+                assert (statinfo.st_mode & 0o777) == expected_mode, "Others have no access"
 
         @pytest.mark.skipif(not is_windows(), reason="Windows-specific test")
         @pytest.mark.xfail(
@@ -528,7 +506,7 @@ class TestEmbeddedFiles:
             reason=WIN_SET_TEST_ENV_VARS_MESSAGE,
         )
         def test_basic_as_user_windows(
-            self, tmp_path: Path, windows_user: WindowsSessionUser
+            self, materialize_dir: Path, windows_user: WindowsSessionUser
         ) -> None:
             # Basic test - we can write several files and they show up in the filesystem
             # where reported.
@@ -570,9 +548,9 @@ class TestEmbeddedFiles:
                 for f in test_data
             ]
             test_obj = EmbeddedFiles(
-                logger=MagicMock(),
+                logger=NULL_LOGGER,
                 scope=EmbeddedFilesScope.ENV,
-                session_files_directory=tmp_path,
+                session_files_directory=materialize_dir,
                 user=windows_user,
             )
 
@@ -584,15 +562,14 @@ class TestEmbeddedFiles:
                 assert data.symbol in symtab, f"Symbol for {data.name} is in the symtab"
                 filename = symtab[data.symbol]
                 assert os.path.exists(filename), f"File exists for {data.name}"
-                with open(filename, "r") as file:
-                    result_contents = file.read()
+                result_contents = Path(filename).read_text()
                 assert result_contents == data.data, "File contents are as expected"
                 # Check file permissions
                 assert principal_has_access_to_object(
                     filename, windows_user.user, MODIFY_READ_WRITE_MASK
                 ), "Windows user has access"
 
-        def test_resolves_symbols(self, tmp_path: Path) -> None:
+        def test_resolves_symbols(self, materialize_dir: Path) -> None:
             # Tests that the set of files can reference themselves and each other
             # in their file data, and that we write the correct data.
 
@@ -633,9 +610,9 @@ class TestEmbeddedFiles:
             """
             expected_file_data: str = f"""
             Symbol
-            {str(tmp_path / test_data[0].filename)}
-            {str(tmp_path / test_data[1].filename)}
-            {str(tmp_path / test_data[2].filename)}
+            {str(materialize_dir / test_data[0].filename)}
+            {str(materialize_dir / test_data[1].filename)}
+            {str(materialize_dir / test_data[2].filename)}
             """
             given_files = [
                 EmbeddedFileText_2023_09(
@@ -647,7 +624,9 @@ class TestEmbeddedFiles:
                 for f in test_data
             ]
             test_obj = EmbeddedFiles(
-                logger=MagicMock(), scope=EmbeddedFilesScope.ENV, session_files_directory=tmp_path
+                logger=NULL_LOGGER,
+                scope=EmbeddedFilesScope.ENV,
+                session_files_directory=materialize_dir,
             )
 
             # WHEN
@@ -658,6 +637,5 @@ class TestEmbeddedFiles:
                 assert data.symbol in symtab, f"Symbol for {data.name} is in the symtab"
                 filename = symtab[data.symbol]
                 assert os.path.exists(filename), f"File exists for {data.name}"
-                with open(filename, "r") as file:
-                    result_contents = file.read()
+                result_contents = Path(filename).read_text()
                 assert result_contents == expected_file_data, "File contents are as expected"
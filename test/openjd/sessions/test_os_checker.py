@@ -1,50 +1,37 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
-import unittest
-from enum import Enum
-from unittest.mock import patch
-from openjd.sessions._os_checker import is_posix, is_windows, check_os
-
-
-class OSName(str, Enum):
-    POSIX = "posix"
-    WINDOWS = "nt"
-
+import os
 
-class TestOSChecker(unittest.TestCase):
-    @patch("openjd.sessions._os_checker.os")
-    def test_is_posix(self, mock_os):
-        mock_os.name = OSName.POSIX
-        self.assertTrue(is_posix())
+import pytest
 
-    @patch("openjd.sessions._os_checker.os")
-    def test_is_not_posix(self, mock_os):
-        mock_os.name = OSName.WINDOWS
-        self.assertFalse(is_posix())
-
-    @patch("openjd.sessions._os_checker.os")
-    def test_is_windows(self, mock_os):
-        mock_os.name = OSName.WINDOWS
-        self.assertTrue(is_windows())
-
-    @patch("openjd.sessions._os_checker.os")
-    def test_is_not_windows(self, mock_os):
-        mock_os.name = OSName.POSIX
-        self.assertFalse(is_windows())
-
-    @patch("openjd.sessions._os_checker.os")
-    def test_check_os_posix(self, mock_os):
-        mock_os.name = OSName.POSIX
-        check_os()
+from openjd.sessions import _os_checker
+from openjd.sessions._os_checker import is_posix, is_windows, check_os
 
-    @patch("openjd.sessions._os_checker.os")
-    def test_check_os_windows(self, mock_os):
-        mock_os.name = OSName.WINDOWS
-        check_os()
 
-    @patch("openjd.sessions._os_checker.os")
-    def test_check_os_unsupported(self, mock_os):
-        mock_os.name = "unsupported_os"
-        with self.assertRaises(NotImplementedError) as context:
+class TestOSChecker:
+    def test_flags_match_os_name(self) -> None:
+        assert _os_checker._IS_POSIX == (os.name == _os_checker.POSIX)
+        assert _os_checker._IS_WINDOWS == (os.name == _os_checker.WINDOWS)
+
+    @pytest.mark.parametrize(
+        "posix,windows",
+        [
+            pytest.param(True, False, id="posix"),
+            pytest.param(False, True, id="windows"),
+            pytest.param(False, False, id="unsupported"),
+        ],
+    )
+    def test_checks(self, monkeypatch: pytest.MonkeyPatch, posix: bool, windows: bool) -> None:
+        # GIVEN
+        monkeypatch.setattr(_os_checker, "_IS_POSIX", posix)
+        monkeypatch.setattr(_os_checker, "_IS_WINDOWS", windows)
+
+        # THEN
+        assert is_posix() == posix
+        assert is_windows() == windows
+        if posix or windows:
             check_os()
-        self.assertIn("os: unsupported_os is not supported yet.", str(context.exception))
+        else:
+            with pytest.raises(NotImplementedError) as excinfo:
+                check_os()
+            assert f"os: {os.name} is not supported yet." in str(excinfo.value)
@@ -1,35 +1,165 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
-from enum import Enum
 from pathlib import PurePath, PurePosixPath, PureWindowsPath
-from unittest.mock import patch
 
 import pytest
 
 from openjd.sessions import PathFormat, PathMappingRule
 from openjd.sessions import _path_mapping as path_mapping_impl_mod
+from openjd.sessions._os_checker import POSIX, WINDOWS
 
 
-class OSName(str, Enum):
-    POSIX = "posix"
-    WINDOWS = "nt"
+# The rules under test, built once and shared by every case that applies them.
+_RULE_POSIX_TO_POSIX = PathMappingRule(
+    source_path_format=PathFormat.POSIX,
+    source_path=PurePosixPath("/mnt/shared/"),
+    destination_path=PurePosixPath("/newprefix"),
+)
+_RULE_POSIX_TO_WIN = PathMappingRule(
+    source_path_format=PathFormat.POSIX,
+    source_path=PurePosixPath("/mnt/shared/"),
+    destination_path=PureWindowsPath("c:\\newprefix"),
+)
+_RULE_WIN_TO_POSIX = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("c:\\mnt\\shared\\"),
+    destination_path=PurePosixPath("/newprefix"),
+)
+_RULE_WIN_TO_WIN = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("c:\\mnt\\shared\\"),
+    destination_path=PureWindowsPath("c:\\newprefix"),
+)
+_RULE_UNC_FROM = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("\\\\128.0.0.1\\share\\assets"),
+    destination_path=PureWindowsPath("z:\\assets"),
+)
+_RULE_UNC_TO = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("z:\\assets"),
+    destination_path=PureWindowsPath("\\\\128.0.0.1\\share\\assets"),
+)
+_RULE_DOSDOT_FROM = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("\\\\.\\c:\\assets"),
+    destination_path=PureWindowsPath("z:\\assets"),
+)
+_RULE_DOSDOT_TO = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("z:\\assets"),
+    destination_path=PureWindowsPath("\\\\.\\c:\\assets"),
+)
+_RULE_DOSQ_FROM = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("\\\\?\\c:\\assets"),
+    destination_path=PureWindowsPath("z:\\assets"),
+)
+_RULE_DOSQ_TO = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("z:\\assets"),
+    destination_path=PureWindowsPath("\\\\?\\c:\\assets"),
+)
+_RULE_DOSVOL_FROM = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("\\\\?\\Volume{b75e2c83-0000-0000-0000-602f12345678}\\assets"),
+    destination_path=PureWindowsPath("z:\\assets"),
+)
+_RULE_DOSVOL_TO = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("z:\\assets"),
+    destination_path=PureWindowsPath("\\\\?\\Volume{b75e2c83-0000-0000-0000-602f12345678}\\assets"),
+)
+
+
+# The rules that from_dict() should build, whatever the case of source_path_format.
+_RULE_FROM_DICT_WIN = PathMappingRule(
+    source_path_format=PathFormat.WINDOWS,
+    source_path=PureWindowsPath("C:\\oldprefix"),
+    destination_path=PurePath("c:\\newprefix"),
+)
+_RULE_FROM_DICT_POSIX = PathMappingRule(
+    source_path_format=PathFormat.POSIX,
+    source_path=PurePosixPath("/mnt/oldprefix"),
+    destination_path=PurePath("c:\\newprefix"),
+)
+_FROM_DICT_OK = (
+    (
+        {
+            "source_path_format": "WINDOWS",
+            "source_path": "C:\\oldprefix",
+            "destination_path": "c:\\newprefix",
+        },
+        _RULE_FROM_DICT_WIN,
+    ),
+    (
+        {
+            "source_path_format": "POSIX",
+            "source_path": "/mnt/oldprefix",
+            "destination_path": "c:\\newprefix",
+        },
+        _RULE_FROM_DICT_POSIX,
+    ),
+    (
+        {
+            "source_path_format": "windows",
+            "source_path": "C:\\oldprefix",
+            "destination_path": "c:\\newprefix",
+        },
+        _RULE_FROM_DICT_WIN,
+    ),
+    (
+        {
+            "source_path_format": "posix",
+            "source_path": "/mnt/oldprefix",
+            "destination_path": "c:\\newprefix",
+        },
+        _RULE_FROM_DICT_POSIX,
+    ),
+)
+_FROM_DICT_BAD = (
+    {
+        "source_path_format": "WINDOWS10",
+        "source_path": "C:\\oldprefix",
+        "destination_path": "c:\\newprefix",
+    },
+    {"source_path": "/mnt/oldprefix", "destination_path": "c:\\newprefix"},
+    {"source_path_format": "POSIX", "destination_path": "c:\\newprefix"},
+    {"source_path_format": "POSIX", "source_path": "/mnt/oldprefix"},
+    {
+        "source_path_format": "windows",
+        "source_path": "C:\\oldprefix",
+        "destination_path": "c:\\newprefix",
+        "extra_field": "value",
+    },
+)
 
 
 class TestPathMapping:
+    @staticmethod
+    def _assert_remaps(
+        monkeypatch: pytest.MonkeyPatch,
+        rule: PathMappingRule,
+        dest_os: str,
+        given: str,
+        expected: str,
+    ) -> None:
+        # Test that the given path is modified to the expected form
+
+        # GIVEN
+        monkeypatch.setattr(path_mapping_impl_mod, "os_name", dest_os)
+
+        # WHEN
+        changed, result = rule.apply(path=given)
+
+        # THEN
+        assert changed
+        assert result == expected
+
     @pytest.mark.parametrize(
-        "rule, dest_os, given, expected",
+        "given, expected",
         [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.POSIX,
-                    source_path=PurePosixPath("/mnt/shared/"),
-                    destination_path=PurePosixPath("/newprefix"),
-                ),
-                OSName.POSIX,
-                source,
-                dest,
-                id=id,
-            )
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 ("/mnt/shared", "/newprefix", "posix->posix: sourcepath"),
                 ("/mnt/shared/", "/newprefix/", "posix->posix: sourcepath-trailing-slash"),
@@ -48,19 +178,17 @@ class TestPathMapping:
                     "posix->posix: 2-level relative dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.POSIX,
-                    source_path=PurePosixPath("/mnt/shared/"),
-                    destination_path=PureWindowsPath("c:\\newprefix"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_posix_to_posix(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_POSIX_TO_POSIX, POSIX, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 ("/mnt/shared", "c:\\newprefix", "posix->windows: sourcepath"),
                 ("/mnt/shared/", "c:\\newprefix\\", "posix->windows: sourcepath-trailing-slash"),
@@ -87,19 +215,17 @@ class TestPathMapping:
                     "posix->windows: 2-level relative dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("c:\\mnt\\shared\\"),
-                    destination_path=PurePosixPath("/newprefix"),
-                ),
-                OSName.POSIX,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_posix_to_windows(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_POSIX_TO_WIN, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 ("c:\\mnt\\shared", "/newprefix", "windows->posix: sourcepath"),
                 ("c:\\mnt\\shared\\", "/newprefix/", "windows->posix: sourcepath-trailing-slash"),
@@ -126,19 +252,17 @@ class TestPathMapping:
                     "windows->posix: 2-level relative dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("c:\\mnt\\shared\\"),
-                    destination_path=PureWindowsPath("c:\\newprefix"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_windows_to_posix(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_WIN_TO_POSIX, POSIX, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 ("c:\\mnt\\shared", "c:\\newprefix", "windows->windows: sourcepath"),
                 (
@@ -169,19 +293,17 @@ class TestPathMapping:
                     "windows->windows: 2-level relative dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("\\\\128.0.0.1\\share\\assets"),
-                    destination_path=PureWindowsPath("z:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_windows_to_windows(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_WIN_TO_WIN, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "\\\\128.0.0.1\\share\\assets\\file",
@@ -194,19 +316,17 @@ class TestPathMapping:
                     "windows->windows: from unc dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("z:\\assets"),
-                    destination_path=PureWindowsPath("\\\\128.0.0.1\\share\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_from_unc(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_UNC_FROM, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "z:\\assets\\file",
@@ -219,19 +339,17 @@ class TestPathMapping:
                     "windows->windows: to unc dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("\\\\.\\c:\\assets"),
-                    destination_path=PureWindowsPath("z:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_to_unc(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_UNC_TO, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "\\\\.\\c:\\assets\\file",
@@ -244,19 +362,17 @@ class TestPathMapping:
                     "windows->windows: from dos device path dot dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("z:\\assets"),
-                    destination_path=PureWindowsPath("\\\\.\\c:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_from_dos_device_path_dot(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_DOSDOT_FROM, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "z:\\assets\\file",
@@ -269,19 +385,17 @@ class TestPathMapping:
                     "windows->windows: to dos device path dot dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("\\\\?\\c:\\assets"),
-                    destination_path=PureWindowsPath("z:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_to_dos_device_path_dot(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_DOSDOT_TO, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "\\\\?\\c:\\assets\\file",
@@ -294,19 +408,17 @@ class TestPathMapping:
                     "windows->windows: from dos device path ? dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("z:\\assets"),
-                    destination_path=PureWindowsPath("\\\\?\\c:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_from_dos_device_path_question_mark(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_DOSQ_FROM, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "z:\\assets\\file",
@@ -319,21 +431,17 @@ class TestPathMapping:
                     "windows->windows: to dos device path ? dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath(
-                        "\\\\?\\Volume{b75e2c83-0000-0000-0000-602f12345678}\\assets"
-                    ),
-                    destination_path=PureWindowsPath("z:\\assets"),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_to_dos_device_path_question_mark(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_DOSQ_TO, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "\\\\?\\Volume{b75e2c83-0000-0000-0000-602f12345678}\\assets\\file",
@@ -346,21 +454,17 @@ class TestPathMapping:
                     "windows->windows: from dos device path volume dir",
                 ),
             )
-        ]
-        + [
-            pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("z:\\assets"),
-                    destination_path=PureWindowsPath(
-                        "\\\\?\\Volume{b75e2c83-0000-0000-0000-602f12345678}\\assets"
-                    ),
-                ),
-                OSName.WINDOWS,
-                source,
-                dest,
-                id=id,
-            )
+        ],
+    )
+    def test_remaps_from_dos_device_path_volume(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
+    ) -> None:
+        self._assert_remaps(monkeypatch, _RULE_DOSVOL_FROM, WINDOWS, given, expected)
+
+    @pytest.mark.parametrize(
+        "given, expected",
+        [
+            pytest.param(source, dest, id=id)
             for source, dest, id in (
                 (
                     "z:\\assets\\file",
@@ -375,28 +479,16 @@ class TestPathMapping:
             )
         ],
     )
-    def test_remaps(
-        self, rule: PathMappingRule, dest_os: OSName, given: str, expected: str
+    def test_remaps_to_dos_device_path_volume(
+        self, monkeypatch: pytest.MonkeyPatch, given: str, expected: str
     ) -> None:
-        # Test that the given path is modified to the expected form
-
-        # WHEN
-        with patch(f"{path_mapping_impl_mod.__name__}.os_name", dest_os.value):
-            changed, result = rule.apply(path=given)
-
-        # THEN
-        assert changed
-        assert result == expected
+        self._assert_remaps(monkeypatch, _RULE_DOSVOL_TO, WINDOWS, given, expected)
 
     @pytest.mark.parametrize(
         "rule, given",
         [
             pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.POSIX,
-                    source_path=PurePosixPath("/mnt/shared"),
-                    destination_path=PureWindowsPath("c:\\newprefix"),
-                ),
+                _RULE_POSIX_TO_WIN,
                 path,
                 id=id,
             )
@@ -408,11 +500,7 @@ class TestPathMapping:
         ]
         + [
             pytest.param(
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("c:\\mnt\\shared\\"),
-                    destination_path=PureWindowsPath("c:\\newprefix"),
-                ),
+                _RULE_WIN_TO_WIN,
                 path,
                 id=id,
             )
@@ -452,86 +540,12 @@ class TestPathMapping:
         with pytest.raises(ValueError):
             PathMappingRule(**rule_params)
 
-    @pytest.mark.parametrize(
-        "dict_rule, expected",
-        [
-            (
-                {
-                    "source_path_format": "WINDOWS",
-                    "source_path": "C:\\oldprefix",
-                    "destination_path": "c:\\newprefix",
-                },
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("C:\\oldprefix"),
-                    destination_path=PurePath("c:\\newprefix"),
-                ),
-            ),
-            (
-                {
-                    "source_path_format": "POSIX",
-                    "source_path": "/mnt/oldprefix",
-                    "destination_path": "c:\\newprefix",
-                },
-                PathMappingRule(
-                    source_path_format=PathFormat.POSIX,
-                    source_path=PurePosixPath("/mnt/oldprefix"),
-                    destination_path=PurePath("c:\\newprefix"),
-                ),
-            ),
-            (
-                {
-                    "source_path_format": "windows",
-                    "source_path": "C:\\oldprefix",
-                    "destination_path": "c:\\newprefix",
-                },
-                PathMappingRule(
-                    source_path_format=PathFormat.WINDOWS,
-                    source_path=PureWindowsPath("C:\\oldprefix"),
-                    destination_path=PurePath("c:\\newprefix"),
-                ),
-            ),
-            (
-                {
-                    "source_path_format": "posix",
-                    "source_path": "/mnt/oldprefix",
-                    "destination_path": "c:\\newprefix",
-                },
-                PathMappingRule(
-                    source_path_format=PathFormat.POSIX,
-                    source_path=PurePosixPath("/mnt/oldprefix"),
-                    destination_path=PurePath("c:\\newprefix"),
-                ),
-            ),
-        ],
-    )
+    @pytest.mark.parametrize("dict_rule, expected", _FROM_DICT_OK)
     def test_from_dict_success(self, dict_rule, expected):
         rule = PathMappingRule.from_dict(dict_rule)
         assert rule == expected
 
-    @pytest.mark.parametrize(
-        "dict_rule",
-        [
-            (
-                {
-                    "source_path_format": "WINDOWS10",
-                    "source_path": "C:\\oldprefix",
-                    "destination_path": "c:\\newprefix",
-                }
-            ),
-            ({"source_path": "/mnt/oldprefix", "destination_path": "c:\\newprefix"}),
-            ({"source_path_format": "POSIX", "destination_path": "c:\\newprefix"}),
-            ({"source_path_format": "POSIX", "source_path": "/mnt/oldprefix"}),
-            (
-                {
-                    "source_path_format": "windows",
-                    "source_path": "C:\\oldprefix",
-                    "destination_path": "c:\\newprefix",
-                    "extra_field": "value",
-                }
-            ),
-        ],
-    )
+    @pytest.mark.parametrize("dict_rule", _FROM_DICT_BAD)
     def test_from_dict_failure(self, dict_rule):
         with pytest.raises(ValueError):
             PathMappingRule.from_dict(dict_rule)
@@ -3,11 +3,11 @@
 import json
 import os
 import sys
-import time
 from datetime import datetime, timedelta
-from logging.handlers import QueueHandler
+from logging import LoggerAdapter
 from pathlib import Path
 from queue import SimpleQueue
+from threading import Event
 from typing import Optional, cast
 from unittest.mock import MagicMock, call
 
@@ -22,7 +22,7 @@ from openjd.model.v2023_09 import (
 from openjd.model.v2023_09 import (
     EmbeddedFileTypes as EmbeddedFileTypes_2023_09,
 )
-from openjd.sessions import ActionState, PosixSessionUser, WindowsSessionUser
+from openjd.sessions import ActionState, PosixSessionUser, SessionUser, WindowsSessionUser
 from openjd.sessions._embedded_files import EmbeddedFilesScope
 from openjd.sessions._os_checker import is_posix, is_windows
 
@@ -35,15 +35,45 @@ from openjd.sessions._runner_base import (
 from openjd.sessions._tempdir import TempDir
 
 from .conftest import (
-    build_logger,
     collect_queue_messages,
     has_posix_target_user,
     has_windows_user,
     WIN_SET_TEST_ENV_VARS_MESSAGE,
     POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
+    NULL_LOGGER,
 )
 
 
+_TERMINAL_ACTION_STATES = frozenset(
+    (ActionState.SUCCESS, ActionState.FAILED, ActionState.CANCELED, ActionState.TIMEOUT)
+)
+
+
+def _make_waiter() -> tuple[MagicMock, Event]:
+    """Create a runner callback, and an Event that it sets once the runner reports
+    that its action has reached a terminal state.
+    """
+    done = Event()
+
+    def _on_state(state: ActionState) -> None:
+        if state in _TERMINAL_ACTION_STATES:
+            done.set()
+
+    return MagicMock(side_effect=_on_state), done
+
+
+def _wait_for_output(message_queue: SimpleQueue, line: str) -> list[str]:
+    """Drain the messages that a runner has logged until the given line shows up, and return
+    them. Lets a test act as soon as its subprocess is ready instead of sleeping.
+    """
+    messages: list[str] = []
+    while True:
+        message = message_queue.get(timeout=25).getMessage()
+        messages.append(message)
+        if message == line:
+            return messages
+
+
 # For testing, since ScriptRunnerBase is an abstract base class.
 class TerminatingRunner(ScriptRunnerBase):
     _cancel_called = False
@@ -59,150 +89,187 @@ class NotifyingRunner(ScriptRunnerBase):
     def cancel(
         self, *, time_limit: Optional[timedelta] = None, mark_action_failed: bool = False
     ) -> None:
-        self._cancel_called_at = datetime.utcnow()
         if time_limit is None:
             self._cancel(NotifyCancelMethod(timedelta(seconds=2)))
         else:
             self._cancel(NotifyCancelMethod(time_limit))
 
 
-# tmp_path - builtin temporary directory
-@pytest.mark.usefixtures("tmp_path")
+# The snippets that these tests run only need the standard library, so skip the site import and
+# isolate them from the user's site-packages and PYTHON* variables to start the interpreter faster.
+_PYTHON_NO_SITE = (sys.executable, "-I", "-S")
+
+_SUPPORT_FILES = (Path(__file__).parent / "support_files").resolve()
+_APP_20S_RUN = _SUPPORT_FILES / "app_20s_run.py"
+_APP_20S_RUN_IGNORE_SIGNAL = _SUPPORT_FILES / "app_20s_run_ignore_signal.py"
+# Seconds that the app_20s_run*.py support apps run for in these tests. Every test cancels them
+# well before then, and a failed cancel still finishes the test in this time rather than 20s.
+_APP_RUNTIME = "10"
+
+# Actions for the _run_action tests. Constructed once, as building the models runs their
+# validation; _run_action only reads them.
+_RUN_APP_ACTION = Action_2023_09(
+    command="{{Task.PythonInterpreter}}",
+    args=["{{Task.ScriptFile}}", _APP_RUNTIME],
+    timeout=5,
+)
+_BAD_FORMATSTRING_ACTION = Action_2023_09(
+    command="{{Task.PythonInterpreter}}", args=["{{Task.ScriptFile}}"], timeout=1
+)
+
+_TEST_ENV_VARS: dict[str, Optional[str]] = {
+    "FOO": "BAR",
+    "dollar_sign": "This costs $100",
+    "single_quote": "They're smart",
+    "double_quote": 'They said, "Hello!"',
+    "back_slash": "C:\\Windows\\System32",
+    "caret_symbol": "Up^Down",
+    "pipe_symbol": "Left|Right",
+    "ampersand_symbol": "Fish&Chips",
+    "less_than": "1 < 2",
+    "greater_than": "3 > 2",
+    "asterisk_star": "Twinkle*twinkle",
+    "question_mark": "Who? What? Where?",
+    "colon_symbol": "Time: 12:00 PM",
+    "semicolon_symbol": "Item1; Item2; Item3",
+    "equal_sign": "1 + 1 = 2",
+    "at_symbol": "user@example.com",
+    "hash_symbol": "#1 Winner",
+    "tilde_symbol": "Approximately~100",
+    "percent_symbol": "50% off",
+    "exclamation_mark": "Surprise!",
+    "square_brackets": "Array[5]",
+    "win_injection1": "& Get-Process",
+    "win_injection2": "; Get-Process",
+    "win_injection3": "| Get-Process",
+    "win_injection4": "& Get-Process",
+    "win_injection5": "nGet-ChildItem C:\\",
+    "win_injection6": "rnStart-Process notepad.exe",
+    "win_injection7": "$(Get-Process)",
+    "posix_injection1": "$(whoami)",
+    "posix_injection2": "; whoami",
+    "posix_injection3": "| whoami",
+}
+# A snippet that prints the subprocess's environment as "<name> = <value>" lines, and the lines
+# that it must print for _TEST_ENV_VARS. Windows reports environment variable names upper-cased.
+_PRINT_ENV_CODE = r"import os;print(*(f'{k} = {v}' for k,v in os.environ.items()), sep='\n')"
+_TEST_ENV_VAR_LINES = frozenset(
+    f"{key.upper() if is_windows() else key} = {value}" for key, value in _TEST_ENV_VARS.items()
+)
+
+
+@pytest.fixture(scope="class")
+def shared_working_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A session working directory shared by the tests of a class that never inspect its
+    contents. The runners only write uniquely named scripts to it, so the tests cannot collide."""
+    return tmp_path_factory.mktemp("runner_shared")
+
+
 class TestScriptRunnerBase:
-    test_env_vars: dict[str, Optional[str]] = {
-        "FOO": "BAR",
-        "dollar_sign": "This costs $100",
-        "single_quote": "They're smart",
-        "double_quote": 'They said, "Hello!"',
-        "back_slash": "C:\\Windows\\System32",
-        "caret_symbol": "Up^Down",
-        "pipe_symbol": "Left|Right",
-        "ampersand_symbol": "Fish&Chips",
-        "less_than": "1 < 2",
-        "greater_than": "3 > 2",
-        "asterisk_star": "Twinkle*twinkle",
-        "question_mark": "Who? What? Where?",
-        "colon_symbol": "Time: 12:00 PM",
-        "semicolon_symbol": "Item1; Item2; Item3",
-        "equal_sign": "1 + 1 = 2",
-        "at_symbol": "user@example.com",
-        "hash_symbol": "#1 Winner",
-        "tilde_symbol": "Approximately~100",
-        "percent_symbol": "50% off",
-        "exclamation_mark": "Surprise!",
-        "square_brackets": "Array[5]",
-        "win_injection1": "& Get-Process",
-        "win_injection2": "; Get-Process",
-        "win_injection3": "| Get-Process",
-        "win_injection4": "& Get-Process",
-        "win_injection5": "nGet-ChildItem C:\\",
-        "win_injection6": "rnStart-Process notepad.exe",
-        "win_injection7": "$(Get-Process)",
-        "posix_injection1": "$(whoami)",
-        "posix_injection2": "; whoami",
-        "posix_injection3": "| whoami",
-    }
-
-    def test_initialized(self, tmp_path: Path) -> None:
+    def test_initialized(self, shared_working_dir: Path) -> None:
         # Test the property getters for a runner that is only initialized.
 
         # GIVEN
-        with TerminatingRunner(logger=MagicMock(), session_working_directory=tmp_path) as runner:
+        with TerminatingRunner(
+            logger=NULL_LOGGER, session_working_directory=shared_working_dir
+        ) as runner:
             pass
 
         # THEN
         assert runner.state == ScriptRunnerState.READY
         assert runner.exit_code is None
 
-    def test_basic_run(self, tmp_path: Path) -> None:
+    def test_basic_run(self, shared_working_dir: Path) -> None:
         # Run a simple command with no timeout and check the state during and
         # after the run.
 
         # GIVEN
-        callback = MagicMock()
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=MagicMock(), session_working_directory=tmp_path, callback=callback
+            logger=NULL_LOGGER, session_working_directory=shared_working_dir, callback=callback
         ) as runner:
             # WHEN
-            runner._run([sys.executable, "-c", "import time; time.sleep(0.25)"])
+            runner._run([*_PYTHON_NO_SITE, "-c", "import time; time.sleep(0.25)"])
 
             # THEN
             assert runner.state == ScriptRunnerState.RUNNING
             assert runner.exit_code is None
-            current_wait_seconds = 0
-            while runner.state == ScriptRunnerState.RUNNING and current_wait_seconds < 10:
-                time.sleep(1)
-                current_wait_seconds += 1
+            assert done.wait(timeout=25)
             assert runner.state == ScriptRunnerState.SUCCESS
             assert runner.exit_code == 0
         callback.assert_has_calls([call(ActionState.RUNNING), call(ActionState.SUCCESS)])
 
-    @pytest.mark.parametrize("attempt", [i for i in range(0, 100)])
-    def test_fast_run_no_deadlock(self, attempt: int, tmp_path: Path) -> None:
+    def test_fast_run_no_deadlock(self, shared_working_dir: Path) -> None:
         # Run a really fast command multiple times. We're trying to ensure that there's no
         # deadlock in between the _run() and _on_process_exit() method obtaining the lock.
         # This is a probabilistic test; it is not 100% reliable for reproducing the deadlock.
 
-        # GIVEN
-        callback = MagicMock()
-        with TerminatingRunner(
-            logger=MagicMock(), session_working_directory=tmp_path, callback=callback
-        ) as runner:
-            # WHEN
-            runner._run(["whoami"])
+        for _ in range(100):
+            # GIVEN
+            callback, done = _make_waiter()
+            with TerminatingRunner(
+                logger=NULL_LOGGER, session_working_directory=shared_working_dir, callback=callback
+            ) as runner:
+                # WHEN
+                runner._run(["whoami"])
 
-            # THEN
-            # Nothing to check. We just want to run it fast. The test will deadlock if
-            # we have a problem. Just wait for the application to exit
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.0001)
+                # THEN
+                # Nothing to check. We just want to run it fast. The test will deadlock if
+                # we have a problem. Just wait for the application to exit
+                assert done.wait(timeout=25)
 
     def test_working_dir_is_cwd(
-        self, tmp_path: Path, message_queue: SimpleQueue, queue_handler: QueueHandler
+        self, tmp_path: Path, message_queue: SimpleQueue, queue_logger: LoggerAdapter
     ) -> None:
         # Test to make sure that the current working dir of the command that's run is
         # the startup directory.
 
         # GIVEN
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmp_path, startup_directory=tmp_path
+            logger=queue_logger,
+            session_working_directory=tmp_path,
+            startup_directory=tmp_path,
+            callback=callback,
         ) as runner:
             # WHEN
-            runner._run([sys.executable, "-c", "import os; print(os.getcwd())"])
+            runner._run([*_PYTHON_NO_SITE, "-c", "import os; print(os.getcwd())"])
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         messages = collect_queue_messages(message_queue)
         assert str(tmp_path) in messages
 
-    def test_failing_run(self, tmp_path: Path) -> None:
+    def test_failing_run(self, shared_working_dir: Path) -> None:
         # Test to make sure that we properly communicate a process with
         # non-zero return as
 
         # GIVEN
-        with TerminatingRunner(logger=MagicMock(), session_working_directory=tmp_path) as runner:
+        callback, done = _make_waiter()
+        with TerminatingRunner(
+            logger=NULL_LOGGER, session_working_directory=shared_working_dir, callback=callback
+        ) as runner:
             # WHEN
-            runner._run([sys.executable, "-c", "import sys; sys.exit(1)"])
+            runner._run([*_PYTHON_NO_SITE, "-c", "import sys; sys.exit(1)"])
 
             # THEN
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
             assert runner.state == ScriptRunnerState.FAILED
             assert runner.exit_code == 1
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_fail_to_run(
-        self, tmp_path: Path, message_queue: SimpleQueue, queue_handler: QueueHandler
+        self, tmp_path: Path, message_queue: SimpleQueue, queue_logger: LoggerAdapter
     ) -> None:
         # Test that we don't blow up in an unexpected way when we cannot actually
         # run the subprocess for some reason.
 
         # GIVEN
-        logger = build_logger(queue_handler)
-        runner = TerminatingRunner(logger=logger, session_working_directory=tmp_path)
+        callback, done = _make_waiter()
+        runner = TerminatingRunner(
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
+        )
 
         # WHEN
         if is_posix():
@@ -211,15 +278,7 @@ class TestScriptRunnerBase:
             runner._run(["test_failed_command"])
 
         # This process should finish within 25s
-        for _ in range(125):
-            if runner.state in (
-                ScriptRunnerState.FAILED,
-                ScriptRunnerState.SUCCESS,
-                ScriptRunnerState.TIMEOUT,
-            ):
-                break
-            # Give the command time to fail out.
-            time.sleep(0.2)
+        assert done.wait(timeout=25)
 
         messages = collect_queue_messages(message_queue)
 
@@ -233,62 +292,63 @@ class TestScriptRunnerBase:
         assert runner.state == ScriptRunnerState.FAILED
         assert runner.exit_code != 0
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_run_with_env_vars(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Run a simple command with no timeout and check the state during and
         # after the run.
 
         # GIVEN
-        logger = build_logger(queue_handler)
-
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmp_path, os_env_vars=self.test_env_vars
+            logger=queue_logger,
+            session_working_directory=tmp_path,
+            os_env_vars=_TEST_ENV_VARS,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(
                 [
-                    sys.executable,
+                    *_PYTHON_NO_SITE,
                     "-c",
-                    r"import os;print(*(f'{k} = {v}' for k,v in os.environ.items()), sep='\n')",
+                    _PRINT_ENV_CODE,
                 ]
             )
 
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         messages = collect_queue_messages(message_queue)
-        for key, value in self.test_env_vars.items():
-            if is_windows():
-                assert f"{key.upper()} = {value}" in messages
-            else:
-                assert f"{key} = {value}" in messages
+        assert _TEST_ENV_VAR_LINES.issubset(messages)
 
     @pytest.mark.skipif(not is_posix(), reason="posix-only test")
     @pytest.mark.xfail(
         not has_posix_target_user(),
         reason=POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
     )
-    @pytest.mark.usefixtures("message_queue", "queue_handler", "posix_target_user")
+    @pytest.mark.usefixtures("message_queue", "queue_logger", "posix_target_user")
     def test_run_as_posix_user(
         self,
         posix_target_user: PosixSessionUser,
+        posix_target_uid: int,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that we run the process as a specific desired user
 
         # GIVEN
         tmpdir = TempDir(user=posix_target_user)
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmpdir.path, user=posix_target_user
+            logger=queue_logger,
+            session_working_directory=tmpdir.path,
+            user=posix_target_user,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(
@@ -303,18 +363,14 @@ class TestScriptRunnerBase:
                 ]
             )
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         assert runner.state == ScriptRunnerState.SUCCESS
         assert runner.exit_code == 0
         messages = collect_queue_messages(message_queue)
         assert str(os.getuid()) not in messages  # type: ignore
-        import pwd
-
-        uid = pwd.getpwnam(posix_target_user.user).pw_uid  # type: ignore
-        assert str(uid) in messages
+        assert str(posix_target_uid) in messages
 
         tmpdir.cleanup()
 
@@ -323,23 +379,24 @@ class TestScriptRunnerBase:
         not has_posix_target_user(),
         reason=POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
     )
-    @pytest.mark.usefixtures("message_queue", "queue_handler", "posix_target_user")
+    @pytest.mark.usefixtures("message_queue", "queue_logger", "posix_target_user")
     def test_run_as_posix_user_with_env_vars(
         self,
         posix_target_user: PosixSessionUser,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that we run the process as a specific desired user with env vars defined as expected
 
         # GIVEN
         tmpdir = TempDir(user=posix_target_user)
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger,
+            logger=queue_logger,
             session_working_directory=tmpdir.path,
             user=posix_target_user,
-            os_env_vars=self.test_env_vars,
+            os_env_vars=_TEST_ENV_VARS,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(
@@ -350,17 +407,15 @@ class TestScriptRunnerBase:
                     #     python is the correct version that we want to run under.
                     "python",
                     "-c",
-                    r"import os;print(*(f'{k} = {v}' for k,v in os.environ.items()), sep='\n')",
+                    _PRINT_ENV_CODE,
                 ]
             )
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         messages = collect_queue_messages(message_queue)
-        for key, value in self.test_env_vars.items():
-            assert f"{key} = {value}" in messages
+        assert _TEST_ENV_VAR_LINES.issubset(messages)
 
         tmpdir.cleanup()
 
@@ -374,7 +429,7 @@ class TestScriptRunnerBase:
         self,
         windows_user: WindowsSessionUser,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that we run the process as a specific desired user
 
@@ -382,15 +437,17 @@ class TestScriptRunnerBase:
         from openjd.sessions._win32._helpers import get_process_user  # type: ignore
 
         tmpdir = TempDir(user=windows_user)
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmpdir.path, user=windows_user
+            logger=queue_logger,
+            session_working_directory=tmpdir.path,
+            user=windows_user,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(["whoami"])
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         assert runner.state == ScriptRunnerState.SUCCESS
@@ -412,21 +469,23 @@ class TestScriptRunnerBase:
         self,
         windows_user: WindowsSessionUser,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test we fail properly when given a command that does not exist
 
         # GIVEN
         tmpdir = TempDir(user=windows_user)
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmpdir.path, user=windows_user
+            logger=queue_logger,
+            session_working_directory=tmpdir.path,
+            user=windows_user,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(["test_not_a_command"])
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         assert runner.state == ScriptRunnerState.FAILED
@@ -442,23 +501,24 @@ class TestScriptRunnerBase:
         reason=WIN_SET_TEST_ENV_VARS_MESSAGE,
     )
     @pytest.mark.timeout(30)
-    @pytest.mark.usefixtures("message_queue", "queue_handler", "windows_user")
+    @pytest.mark.usefixtures("message_queue", "queue_logger", "windows_user")
     def test_run_as_windows_user_with_env_vars(
         self,
         windows_user: WindowsSessionUser,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that we run the process as a specific desired user with env vars defined as expected
 
         # GIVEN
         tmpdir = TempDir(user=windows_user)
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger,
+            logger=queue_logger,
             session_working_directory=tmpdir.path,
             user=windows_user,
-            os_env_vars=self.test_env_vars,
+            os_env_vars=_TEST_ENV_VARS,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(
@@ -469,32 +529,53 @@ class TestScriptRunnerBase:
                     #     python is the correct version that we want to run under.
                     "python",
                     "-c",
-                    r"import os;print(*(f'{k} = {v}' for k,v in os.environ.items()), sep='\n')",
+                    _PRINT_ENV_CODE,
                 ]
             )
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
 
         # THEN
         messages = collect_queue_messages(message_queue)
-        for key, value in self.test_env_vars.items():
-            assert f"{key.upper()} = {value}" in messages
+        assert _TEST_ENV_VAR_LINES.issubset(messages)
 
         tmpdir.cleanup()
 
-    @pytest.mark.skipif(not is_posix(), reason="posix-specific test")
-    @pytest.mark.xfail(
-        not has_posix_target_user(),
-        reason=POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
+    @pytest.mark.parametrize(
+        "user_fixture",
+        [
+            pytest.param(
+                "posix_target_user",
+                marks=[
+                    pytest.mark.skipif(not is_posix(), reason="posix-specific test"),
+                    pytest.mark.xfail(
+                        not has_posix_target_user(),
+                        reason=POSIX_SET_TARGET_USER_ENV_VARS_MESSAGE,
+                    ),
+                    pytest.mark.timeout(40),
+                ],
+                id="posix",
+            ),
+            pytest.param(
+                "windows_user",
+                marks=[
+                    pytest.mark.skipif(not is_windows(), reason="Windows-specific test"),
+                    pytest.mark.xfail(
+                        not has_windows_user(),
+                        reason=WIN_SET_TEST_ENV_VARS_MESSAGE,
+                    ),
+                ],
+                id="windows",
+            ),
+        ],
     )
-    @pytest.mark.usefixtures("message_queue", "queue_handler", "posix_target_user")
-    @pytest.mark.timeout(40)
-    def test_does_not_inherit_env_vars_posix(
+    def test_does_not_inherit_env_vars(
         self,
-        posix_target_user: PosixSessionUser,
+        user_fixture: str,
+        request: pytest.FixtureRequest,
+        monkeypatch: pytest.MonkeyPatch,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Security test.
         # Run a command that tries to read from this process's environment. It should not be able
@@ -504,12 +585,16 @@ class TestScriptRunnerBase:
         # propagated through a user boundary to the subprocess.
 
         # GIVEN
-        tmpdir = TempDir(user=posix_target_user)
+        user: SessionUser = request.getfixturevalue(user_fixture)
+        tmpdir = TempDir(user=user)
         var_name = "TEST_DOES_NOT_INHERIT_ENV_VARS_VAR"
-        os.environ[var_name] = "TEST_VALUE"
-        logger = build_logger(queue_handler)
+        monkeypatch.setenv(var_name, "TEST_VALUE")
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmpdir.path, user=posix_target_user
+            logger=queue_logger,
+            session_working_directory=tmpdir.path,
+            user=user,
+            callback=callback,
         ) as runner:
             # WHEN
             runner._run(
@@ -520,116 +605,62 @@ class TestScriptRunnerBase:
                     #     python is the correct version that we want to run under.
                     "python",
                     "-c",
-                    f"import time; import os; time.sleep(0.25); print(os.environ.get('{var_name}', 'NOT_PRESENT')); print(os.environ)",
+                    f"import time; import os; time.sleep(0.25); print(os.environ.get('{var_name}', 'NOT_PRESENT'))",
                 ]
             )
 
             # THEN
             assert runner.state == ScriptRunnerState.RUNNING
             assert runner.exit_code is None
-            current_wait_seconds = 0
-            while runner.state == ScriptRunnerState.RUNNING and current_wait_seconds < 10:
-                time.sleep(1)
-                current_wait_seconds += 1
+            assert done.wait(timeout=25)
             assert runner.state == ScriptRunnerState.SUCCESS
             assert runner.exit_code == 0
 
         messages = collect_queue_messages(message_queue)
-        assert os.environ[var_name] not in messages
+        assert "TEST_VALUE" not in messages
         assert "NOT_PRESENT" in messages
 
-    @pytest.mark.skipif(not is_windows(), reason="Windows-specific test")
-    @pytest.mark.xfail(
-        not has_windows_user(),
-        reason=WIN_SET_TEST_ENV_VARS_MESSAGE,
-    )
-    def test_does_not_inherit_env_vars_windows(
-        self,
-        windows_user: WindowsSessionUser,
-        message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
-    ) -> None:
-        # Security test.
-        # Run a command that tries to read from this process's environment. It should not be able
-        # to obtain values from it.
-        # Only the cross-user case ensures that environment is not passed through; this is to ensure
-        # that sensitive information that is defines in the initiating process' environment is not
-        # propagated through a user boundary to the subprocess.
-
-        # GIVEN
-        tmpdir = TempDir(user=windows_user)
-        var_name = "TEST_DOES_NOT_INHERIT_ENV_VARS_VAR"
-        os.environ[var_name] = "TEST_VALUE"
-        logger = build_logger(queue_handler)
-        with TerminatingRunner(
-            logger=logger, session_working_directory=tmpdir.path, user=windows_user
-        ) as runner:
-            # WHEN
-            py_script = f"import os; v=os.environ.get('{var_name}'); print('NOT_PRESENT' if v is None else v)"
-            # Use the default 'python' rather than 'sys.executable' since we typically do not have access to
-            # sys.executable when running with impersonation since it's in a hatch environment for the local user.
-            runner._run(["python", "-c", py_script])
-
-            # THEN
-            assert runner.state == ScriptRunnerState.RUNNING
-            assert runner.exit_code is None
-            current_wait_seconds = 0
-            while runner.state == ScriptRunnerState.RUNNING and current_wait_seconds < 10:
-                time.sleep(1)
-                current_wait_seconds += 1
-            assert runner.state == ScriptRunnerState.SUCCESS
-            assert runner.exit_code == 0
-
-        messages = collect_queue_messages(message_queue)
-        assert os.environ[var_name] not in messages
-        assert "NOT_PRESENT" in messages
-
-    def test_cannot_run_twice(self, tmp_path: Path) -> None:
+    def test_cannot_run_twice(self, shared_working_dir: Path) -> None:
         # Run a simple command with no timeout and check the state during and
         # after the run.
 
         # GIVEN
         callback = MagicMock()
         with TerminatingRunner(
-            logger=MagicMock(), session_working_directory=tmp_path, callback=callback
+            logger=NULL_LOGGER, session_working_directory=shared_working_dir, callback=callback
         ) as runner:
             # WHEN
-            runner._run([sys.executable, "-c", "print('hello')"])
+            runner._run([*_PYTHON_NO_SITE, "-c", "print('hello')"])
 
             # THEN
             with pytest.raises(RuntimeError):
-                runner._run([sys.executable, "-c", "print('hello')"])
+                runner._run([*_PYTHON_NO_SITE, "-c", "print('hello')"])
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_run_action(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Run a test of the _run_action method that makes sure that the action runs
         # and the format strings are evaluated.
 
         # GIVEN
-        action = Action_2023_09(
-            command="{{Task.PythonInterpreter}}",
-            args=["{{Task.ScriptFile}}"],
-            timeout=(5),
-        )
-        python_app_loc = (Path(__file__).parent / "support_files" / "app_20s_run.py").resolve()
         symtab = SymbolTable(
             source={
                 "Task.PythonInterpreter": sys.executable,
-                "Task.ScriptFile": str(python_app_loc),
+                "Task.ScriptFile": str(_APP_20S_RUN),
             }
         )
-        logger = build_logger(queue_handler)
-        with TerminatingRunner(logger=logger, session_working_directory=tmp_path) as runner:
+        callback, done = _make_waiter()
+        with TerminatingRunner(
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
+        ) as runner:
             # WHEN
-            runner._run_action(action, symtab)
+            runner._run_action(_RUN_APP_ACTION, symtab)
             # wait for the process to exit
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.2)
+            assert done.wait(timeout=25)
 
         # THEN
         assert runner.state == ScriptRunnerState.TIMEOUT
@@ -640,25 +671,21 @@ class TestScriptRunnerBase:
         assert "Log from test 0" in messages
         assert "Log from test 9" not in messages
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_run_action_bad_formatstring(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Run a test of the _run_action method when the input has a bad format string.
         # We shouldn't even try to run the action in this case, and fail out early.
 
         # GIVEN
-        action = Action_2023_09(
-            command="{{Task.PythonInterpreter}}", args=["{{Task.ScriptFile}}"], timeout=1
-        )
         symtab = SymbolTable()
-        logger = build_logger(queue_handler)
-        with TerminatingRunner(logger=logger, session_working_directory=tmp_path) as runner:
+        with TerminatingRunner(logger=queue_logger, session_working_directory=tmp_path) as runner:
             # WHEN
-            runner._run_action(action, symtab)
+            runner._run_action(_BAD_FORMATSTRING_ACTION, symtab)
 
         # THEN
         assert runner.state == ScriptRunnerState.FAILED
@@ -666,64 +693,62 @@ class TestScriptRunnerBase:
         messages = collect_queue_messages(message_queue)
         assert any(m.startswith("openjd_fail") for m in messages)
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_cancel_terminate(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that the subprocess is terminated when doing a TERMINATE style
         # cancelation
 
         # GIVEN
-        callback = MagicMock()
-        logger = build_logger(queue_handler)
+        callback, done = _make_waiter()
         with TerminatingRunner(
-            logger=logger, session_working_directory=tmp_path, callback=callback
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
         ) as runner:
-            python_app_loc = (Path(__file__).parent / "support_files" / "app_20s_run.py").resolve()
-            runner._run([sys.executable, str(python_app_loc)])
+            runner._run([sys.executable, str(_APP_20S_RUN), _APP_RUNTIME])
 
             # WHEN
             runner.cancel()
 
             # THEN
             # Wait for the app to exit
-            while runner.state == ScriptRunnerState.CANCELING:
-                time.sleep(0.2)
+            assert done.wait(timeout=25)
             assert runner.state == ScriptRunnerState.CANCELED
             assert runner.exit_code != 0
-            time.sleep(1)  # Some time for the cancel callback to be invoked.
             callback.assert_has_calls([call(ActionState.RUNNING), call(ActionState.CANCELED)])
         messages = collect_queue_messages(message_queue)
         # Didn't get to the end of the application run
         assert "Log from test 9" not in messages
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     @pytest.mark.xfail(not is_posix(), reason="Signals not yet implemented for non-posix")
     def test_run_with_time_limit(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that the subprocess is terminated when doing a TERMINATE style
         # cancelation
 
         # GIVEN
-        logger = build_logger(queue_handler)
-        with TerminatingRunner(logger=logger, session_working_directory=tmp_path) as runner:
-            python_app_loc = (Path(__file__).parent / "support_files" / "app_20s_run.py").resolve()
+        callback, done = _make_waiter()
+        with TerminatingRunner(
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
+        ) as runner:
 
             # WHEN
-            runner._run([sys.executable, str(python_app_loc)], time_limit=timedelta(seconds=1))
+            runner._run(
+                [sys.executable, str(_APP_20S_RUN), _APP_RUNTIME], time_limit=timedelta(seconds=1)
+            )
 
             # THEN
             # Wait until the process exits. We'll be in CANCELING state between when the timeout is reached
             # and the process finally exits.
-            while runner.state in (ScriptRunnerState.RUNNING, ScriptRunnerState.CANCELING):
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
             assert runner.state == ScriptRunnerState.TIMEOUT
             assert runner.exit_code != 0
             assert cast(TerminatingRunner, runner)._cancel_called
@@ -731,41 +756,41 @@ class TestScriptRunnerBase:
         # Didn't get to the end of the application run
         assert "Log from test 9" not in messages
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_cancel_notify(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that NOTIFY_THEN_CANCEL first signals a SIGTERM and then a SIGKILL
 
         # GIVEN
-        logger = build_logger(queue_handler)
-        with NotifyingRunner(logger=logger, session_working_directory=tmp_path) as runner:
-            python_app_loc = (
-                Path(__file__).parent / "support_files" / "app_20s_run_ignore_signal.py"
-            ).resolve()
-            runner._run([sys.executable, str(python_app_loc)])
+        callback, done = _make_waiter()
+        with NotifyingRunner(
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
+        ) as runner:
+            runner._run([sys.executable, str(_APP_20S_RUN_IGNORE_SIGNAL), _APP_RUNTIME])
 
             # WHEN
-            secs = 2 if not is_windows() else 5
-            time.sleep(secs)  # Give the process a little time to do something
+            # The app prints its first line once its signal handler is in place.
+            early_messages = _wait_for_output(message_queue, "0")
+            # The NotifyEnd that the runner writes is wall-clock UTC, so it can only be checked
+            # against the wall clock.
             now = datetime.utcnow()
             runner.cancel(time_limit=timedelta(seconds=2))
 
             # THEN
             assert runner.state == ScriptRunnerState.CANCELING
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.CANCELING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
             # This should be CANCELED rather than TIMEOUT because this test is manually calling
             # the cancel() method rather than letting the action reach its runtime limit.
             assert (
                 runner.state == ScriptRunnerState.CANCELED
             )  # TODO - This test is flaky. Sometimes, this is 'RUNNING'
             assert runner.exit_code != 0
-        messages = collect_queue_messages(message_queue)
+        messages = early_messages + collect_queue_messages(message_queue)
         assert "Trapped" in messages
         trapped_idx = messages.index("Trapped")
         # Should be at least one more number printed after the Trapped
@@ -775,9 +800,8 @@ class TestScriptRunnerBase:
         assert "Log from test 9" not in messages
         # Notification file exists
         assert os.path.exists(tmp_path / "cancel_info.json")
-        with open(tmp_path / "cancel_info.json", "r") as file:
-            notification_data_json = file.read()
-        notification_data = json.loads(notification_data_json)
+        with open(tmp_path / "cancel_info.json", "rb") as file:
+            notification_data = json.load(file)
         assert len(notification_data) == 1
         assert "NotifyEnd" in notification_data
         assert notification_data["NotifyEnd"][-1] == "Z"
@@ -787,40 +811,38 @@ class TestScriptRunnerBase:
         delta_t = time_end - now
         assert timedelta(seconds=1) < delta_t < timedelta(seconds=3)
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_cancel_double_cancel_notify(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # Test that NOTIFY_THEN_CANCEL can be called twice, and the second time will
         # shrink the grace period
 
         # GIVEN
-        logger = build_logger(queue_handler)
-        with NotifyingRunner(logger=logger, session_working_directory=tmp_path) as runner:
-            python_app_loc = (
-                Path(__file__).parent / "support_files" / "app_20s_run_ignore_signal.py"
-            ).resolve()
-            runner._run([sys.executable, str(python_app_loc)])
+        callback, done = _make_waiter()
+        with NotifyingRunner(
+            logger=queue_logger, session_working_directory=tmp_path, callback=callback
+        ) as runner:
+            runner._run([sys.executable, str(_APP_20S_RUN_IGNORE_SIGNAL), _APP_RUNTIME])
 
             # WHEN
-            secs = 2 if not is_windows() else 5
-            time.sleep(secs)  # Give the process a little time to do something
+            # The app prints its first line once its signal handler is in place.
+            early_messages = _wait_for_output(message_queue, "0")
             runner.cancel(time_limit=timedelta(seconds=15))
             runner.cancel(time_limit=timedelta(seconds=1 if not is_windows() else 3))
 
             # THEN
             assert runner.state == ScriptRunnerState.CANCELING
             # Wait until the process exits.
-            while runner.state == ScriptRunnerState.RUNNING:
-                time.sleep(0.1)
+            assert done.wait(timeout=25)
         # This should be CANCELED rather than TIMEOUT because this test is manually calling
         # the cancel() method rather than letting the action reach its runtime limit.
         assert runner.state == ScriptRunnerState.CANCELED
         assert runner.exit_code != 0
-        messages = collect_queue_messages(message_queue)
+        messages = early_messages + collect_queue_messages(message_queue)
         assert "Trapped" in messages
         # In this case, the total runtime of the app is 10s
         # so we know that if we didn't get the last index printed
@@ -832,7 +854,7 @@ class TestScriptRunnerBase:
         # populates its given symbol table.
 
         # GIVEN
-        with NotifyingRunner(logger=MagicMock(), session_working_directory=tmp_path) as runner:
+        with NotifyingRunner(logger=NULL_LOGGER, session_working_directory=tmp_path) as runner:
             test_file = EmbeddedFileText_2023_09(
                 name="Foo",
                 type=EmbeddedFileTypes_2023_09.TEXT,
@@ -849,19 +871,18 @@ class TestScriptRunnerBase:
         assert os.path.exists(tmp_path / "test_materialize_files.txt")
         assert len(symtab.symbols) == 1
 
-    @pytest.mark.usefixtures("message_queue", "queue_handler")
+    @pytest.mark.usefixtures("message_queue", "queue_logger")
     def test_materialize_files_fails(
         self,
         tmp_path: Path,
         message_queue: SimpleQueue,
-        queue_handler: QueueHandler,
+        queue_logger: LoggerAdapter,
     ) -> None:
         # A test that _materialize_files handles errors properly when it cannot write the
         # files to disk (e.g. because of permissions).
 
         # GIVEN
-        logger = build_logger(queue_handler)
-        with NotifyingRunner(logger=logger, session_working_directory=tmp_path) as runner:
+        with NotifyingRunner(logger=queue_logger, session_working_directory=tmp_path) as runner:
             dest_dir = (
                 tmp_path / "a" / "file" / "path" / "that" / "definitely" / "does" / "not" / "exist"
             )